@@ -12,16 +12,16 @@ def calc_mape(actual_returns, expected_returns):
     expected_returns = np.array(expected_returns)  # Convert to numpy array
     return np.mean(np.abs((actual_returns - expected_returns) / actual_returns)) * 100
 
-def test_capm_accuracy(data, rf, market_return, beta):
+def calc_capm_accuracy(data, rf, market_return, beta):
     """
-    Test the accuracy of CAPM by comparing expected returns to actual returns.
-    Arguments: ** use up to 23 and then compare to the most present expected returns** 
+    Compare the CAGR of the CAPM sheet prices with the CAPM expected return.
+    Arguments:
         data (dict): Parsed stock data.
         rf (float): Risk-free rate.
         market_return (float): Expected market return.
         beta (float): Calculated beta value for the stock.
     Returns:
-        float: The MAPE of the CAPM model.
+        dict: Dates, prices, time span, both returns and the MAPE.
     """
     capm_data = data["CAPM"]
     stock_data = capm_data["CAPM Sheet"]
@@ -42,17 +42,42 @@ def test_capm_accuracy(data, rf, market_return, beta):
     
     # Calculate the expected annual return using CAPM
     expected_annual_return = CalcExpectedReturn(rf, beta, market_return)
-    
-    print(f"Start Date: {stock_data['Date'].iloc[0]}")
-    print(f"End Date: {stock_data['Date'].iloc[-1]}")
-    print(f"Time Span: {time_span:.2f} years")
-    print(f"Start Price: ${start_price:.2f}")
-    print(f"End Price: ${end_price:.2f}")
-    print(f"Annualized Actual Returns: {annualized_actual_returns:.4f} or {annualized_actual_returns*100:.2f}%")
-    print(f"CAPM Expected Annual Return: {expected_annual_return:.4f} or {expected_annual_return*100:.2f}%")
-    
-    mape = calc_mape([annualized_actual_returns], [expected_annual_return])
-    return mape
+
+    return {
+        'Start Date': stock_data['Date'].iloc[0],
+        'End Date': stock_data['Date'].iloc[-1],
+        'Time Span': time_span,
+        'Start Price': start_price,
+        'End Price': end_price,
+        'Annualized Actual Returns': annualized_actual_returns,
+        'CAPM Expected Annual Return': expected_annual_return,
+        'MAPE': calc_mape([annualized_actual_returns], [expected_annual_return])
+    }
+
+def print_capm_accuracy(accuracy):
+    """ Print the details returned by calc_capm_accuracy. """
+    print(f"Start Date: {accuracy['Start Date']}")
+    print(f"End Date: {accuracy['End Date']}")
+    print(f"Time Span: {accuracy['Time Span']:.2f} years")
+    print(f"Start Price: ${accuracy['Start Price']:.2f}")
+    print(f"End Price: ${accuracy['End Price']:.2f}")
+    print(f"Annualized Actual Returns: {accuracy['Annualized Actual Returns']:.4f} or {accuracy['Annualized Actual Returns']*100:.2f}%")
+    print(f"CAPM Expected Annual Return: {accuracy['CAPM Expected Annual Return']:.4f} or {accuracy['CAPM Expected Annual Return']*100:.2f}%")
+
+def test_capm_accuracy(data, rf, market_return, beta):
+    """
+    Test the accuracy of CAPM by comparing expected returns to actual returns.
+    Arguments: ** use up to 23 and then compare to the most present expected returns** 
+        data (dict): Parsed stock data.
+        rf (float): Risk-free rate.
+        market_return (float): Expected market return.
+        beta (float): Calculated beta value for the stock.
+    Returns:
+        float: The MAPE of the CAPM model.
+    """
+    accuracy = calc_capm_accuracy(data, rf, market_return, beta)
+    print_capm_accuracy(accuracy)
+    return accuracy['MAPE']
 
 def calculate_rmse(actual_prices, simulated_prices):
     # Ensure the lengths match
@@ -0,0 +1,146 @@
+# Backtest.py
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from numpy.lib.stride_tricks import sliding_window_view
+from Capm import CalcExpectedReturn
+
+"""
+WALK-FORWARD BACKTEST:
+    - Slide an estimation window of `window` returns over the price history, moving `step` periods at a time.
+    - At each origin estimate drift and volatility (and beta when market prices are given) from the window.
+    - Sample the GBM terminal distribution `horizon` periods ahead and score it against the realised price.
+    - All origins of one ticker are handled together as 2-D arrays (origins x window / origins x simulations).
+"""
+
+def calc_crps(samples, actual):
+    """
+    Continuous Ranked Probability Score of an ensemble forecast (lower is better).
+    CRPS = E|X - y| - 0.5 * E|X - X'|, using the sorted-sample identity for the second term.
+
+    Parameters:
+        samples (ndarray): Forecast samples (num_forecasts x num_samples).
+        actual (ndarray): Realised values (num_forecasts,).
+
+    Returns:
+        ndarray: CRPS of each forecast.
+    """
+    samples = np.sort(samples, axis=1)
+    m = samples.shape[1]
+    abs_error = np.mean(np.abs(samples - actual[:, None]), axis=1)
+    weights = 2 * np.arange(1, m + 1) - m - 1
+    spread = samples @ weights / m ** 2
+    return abs_error - spread
+
+def calc_window_beta(stock_returns, market_returns):
+    """
+    Beta of every row of two (num_windows x window) return arrays.
+    Uses the same estimator as Capm.CalcBeta (sample covariance over population variance).
+    """
+    n = stock_returns.shape[1]
+    stock_dev = stock_returns - stock_returns.mean(axis=1, keepdims=True)
+    market_dev = market_returns - market_returns.mean(axis=1, keepdims=True)
+    covariance = np.sum(stock_dev * market_dev, axis=1) / (n - 1)
+    market_variance = np.sum(market_dev ** 2, axis=1) / n
+    return covariance / market_variance
+
+def walk_forward_backtest(prices, window=24, horizon=1, step=1, market_prices=None, rf=None, market_return=None,
+                          periods_per_year=12, num_simulations=1000, interval=0.9, rng=np.random):
+    """
+    Walk-forward backtest of GBM price forecasts for a single instrument.
+
+    Parameters:
+        prices (array-like): Price history in chronological order.
+        window (int): Number of returns in each estimation window.
+        horizon (int): Forecast horizon in periods.
+        step (int): Number of periods between forecast origins.
+        market_prices (array-like or None): Market index prices aligned with `prices`. When given together with
+            rf and market_return, the drift is the CAPM expected return from the window beta.
+        rf (float or None): Annual risk-free rate.
+        market_return (float or None): Annual expected market return.
+        periods_per_year (int): Number of price observations per year (12 for monthly data).
+        num_simulations (int): Number of terminal prices sampled at each origin.
+        interval (float): Central probability of the predicted interval used for coverage.
+        rng: Random source exposing standard_normal (np.random or a Generator).
+
+    Returns:
+        dict: Per-origin forecasts and aggregate metrics (RMSE, CRPS, Coverage).
+    """
+    prices = np.asarray(prices, dtype=float)
+    log_returns = np.diff(np.log(prices))
+
+    # Origin i uses returns i-window..i-1 (prices i-window..i) and is scored against price i+horizon
+    origins = np.arange(window, len(prices) - horizon, step)
+    if len(origins) == 0:
+        raise ValueError("Price history is too short for the requested window and horizon.")
+    windows = sliding_window_view(log_returns, window)[origins - window]
+
+    # Annualised volatility and drift estimated from each window
+    sigma = windows.std(axis=1, ddof=1) * np.sqrt(periods_per_year)
+    if market_prices is not None and rf is not None and market_return is not None:
+        market_prices = np.asarray(market_prices, dtype=float)
+        stock_simple = sliding_window_view(prices[1:] / prices[:-1] - 1, window)[origins - window]
+        market_simple = sliding_window_view(market_prices[1:] / market_prices[:-1] - 1, window)[origins - window]
+        beta = calc_window_beta(stock_simple, market_simple)
+        mu = CalcExpectedReturn(rf, beta, market_return)
+    else:
+        beta = np.full(len(origins), np.nan)
+        mu = windows.mean(axis=1) * periods_per_year + 0.5 * sigma ** 2
+
+    # Sample the terminal distribution for every origin at once
+    h = horizon / periods_per_year
+    Z = rng.standard_normal((len(origins), num_simulations))
+    start = prices[origins]
+    samples = start[:, None] * np.exp(((mu - 0.5 * sigma ** 2) * h)[:, None] + (sigma * np.sqrt(h))[:, None] * Z)
+
+    actual = prices[origins + horizon]
+    forecast_mean = samples.mean(axis=1)
+    lower, upper = np.quantile(samples, [(1 - interval) / 2, (1 + interval) / 2], axis=1)
+    crps = calc_crps(samples, actual)
+
+    return {
+        'Origins': origins,
+        'Beta': beta,
+        'Drift': mu,
+        'Volatility': sigma,
+        'Forecast Mean': forecast_mean,
+        'Lower': lower,
+        'Upper': upper,
+        'Actual': actual,
+        'CRPS': crps,
+        'Metrics': {
+            'RMSE': np.sqrt(np.mean((forecast_mean - actual) ** 2)),
+            'CRPS': np.mean(crps),
+            'Coverage': np.mean((actual >= lower) & (actual <= upper))
+        }
+    }
+
+def _backtest_one(args):
+    """ Worker for backtest_universe (module level so it can be pickled). """
+    prices, market_prices, seed, kwargs = args
+    return walk_forward_backtest(prices, market_prices=market_prices, rng=np.random.default_rng(seed), **kwargs)
+
+def backtest_universe(price_data, market_prices=None, max_workers=None, seed=None, **kwargs):
+    """
+    Run walk_forward_backtest for many tickers, spread across processes.
+
+    Parameters:
+        price_data (dict): Ticker -> price history array.
+        market_prices (array-like or None): Market prices shared by all tickers.
+        max_workers (int or None): Number of worker processes (default: number of CPUs). Use 1 to run in-process.
+        seed (int or None): Seed for independent per-ticker random streams.
+        **kwargs: Passed through to walk_forward_backtest.
+
+    Returns:
+        dict: Ticker -> backtest result.
+    """
+    tickers = list(price_data)
+    seeds = np.random.SeedSequence(seed).spawn(len(tickers))
+    jobs = [(price_data[ticker], market_prices, s, kwargs) for ticker, s in zip(tickers, seeds)]
+
+    if max_workers == 1:
+        results = [_backtest_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_backtest_one, jobs))
+
+    return dict(zip(tickers, results))
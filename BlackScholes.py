@@ -14,6 +14,7 @@ DISTRIBUTION:
 
 # blackscholes.py
 import math
+import numpy as np
 from scipy.stats import norm
 """
 FORMULA WITH OUT DIVIDEND:
@@ -64,3 +65,21 @@ def black_scholes_put_div(stock_price, strike_price, time_to_maturity, risk_free
     # Put option price formula with dividends
     put_price_div = strike_price * math.exp(-risk_free_rate * time_to_maturity) * norm.cdf(-d2) - stock_price * math.exp(-dividend_yield * time_to_maturity) * norm.cdf(-d1)
     return put_price_div
+
+"""
+OPTION CHAIN:
+    - Same dividend-adjusted formulas evaluated with numpy over an array of strikes at once.
+"""
+def black_scholes_chain(stock_price, strike_prices, time_to_maturity, risk_free_rate, volatility, dividend_yield=0):
+    strike_prices = np.asarray(strike_prices, dtype=float)
+    # Calculate d1 and d2 for every strike
+    d1 = (np.log(stock_price / strike_prices) + (risk_free_rate - dividend_yield + 0.5 * volatility ** 2) * time_to_maturity) / (volatility * math.sqrt(time_to_maturity))
+    d2 = d1 - volatility * math.sqrt(time_to_maturity)
+
+    discounted_stock = stock_price * math.exp(-dividend_yield * time_to_maturity)
+    discounted_strike = strike_prices * math.exp(-risk_free_rate * time_to_maturity)
+    return {
+        'Strike Price': strike_prices,
+        'Call Price': discounted_stock * norm.cdf(d1) - discounted_strike * norm.cdf(d2),
+        'Put Price': discounted_strike * norm.cdf(-d2) - discounted_stock * norm.cdf(-d1)
+    }
@@ -52,6 +52,15 @@ def CalcMonthlyReturn(df):
     
     return df
 
+def CalcReturns(prices):
+    """
+    Calculate period-over-period returns from a price array (e.g. from PriceStore).
+    Returns:
+        ndarray of returns, one shorter than prices
+    """
+    prices = np.asarray(prices, dtype=float)
+    return prices[1:] / prices[:-1] - 1
+
 def CalcBeta(stock_returns, market_returns):
     """
     Calculate beta between stock and market returns.    
@@ -0,0 +1,150 @@
+# ExcelExport.py
+import os
+import numpy as np
+from openpyxl import Workbook, load_workbook
+
+"""
+STREAMING EXPORT:
+    - Results are written with a write-only openpyxl workbook, which appends rows straight to the file
+      instead of building the full cell model in memory.
+    - The input sheets are copied across row by row from a read-only view of the original workbook, so the
+      parsers in ExcelParse keep working on the exported file. Cell values and formulas are kept, styles are not.
+    - Result sheets are prefixed with "Results" and replaced on every export.
+    - The export goes to a separate workbook by default. Overwriting the input workbook is opt-in (overwrite=True)
+      because the copy drops styles, column widths, charts and defined names, and changes the file the
+      pipeline's parse stages are keyed on.
+    - Tables longer than Excel's row limit continue on "<name> (2)", "<name> (3)", ... sheets.
+"""
+
+EXCEL_MAX_ROWS = 1048576
+RESULT_PREFIX = "Results"
+CHUNK_SIZE = 65536  # Rows converted from numpy to Python values at a time
+
+def iter_array_rows(*columns):
+    """ Yield rows of Python scalars from equal-length numpy columns, converting a chunk at a time. """
+    columns = [np.asarray(column) for column in columns]
+    for start in range(0, len(columns[0]), CHUNK_SIZE):
+        yield from zip(*(column[start:start + CHUNK_SIZE].tolist() for column in columns))
+
+def write_table(workbook, sheet_name, header, rows, max_rows=EXCEL_MAX_ROWS):
+    """
+    Append a table to a write-only workbook.
+
+    Parameters:
+        workbook (Workbook): openpyxl workbook opened with write_only=True.
+        sheet_name (str): Name of the (first) sheet.
+        header (list): Column names, repeated on every continuation sheet.
+        rows (iterable): Rows of cell values, consumed lazily.
+        max_rows (int): Rows per sheet including the header.
+
+    Returns:
+        int: Number of data rows written.
+    """
+    sheet = workbook.create_sheet(sheet_name[:31])
+    sheet.append(list(header))
+    sheet_rows, written, part = 1, 0, 1
+
+    for row in rows:
+        if sheet_rows == max_rows:
+            part += 1
+            suffix = f" ({part})"
+            sheet = workbook.create_sheet(sheet_name[:31 - len(suffix)] + suffix)
+            sheet.append(list(header))
+            sheet_rows = 1
+        sheet.append(row)
+        sheet_rows += 1
+        written += 1
+
+    return written
+
+def summary_rows(results):
+    """ Flatten the nested results dict from integrated_model into (Model, Metric, Value) rows. """
+    for model_name, model_results in results.items():
+        for key, value in model_results.items():
+            yield (model_name, key, float(value))
+
+def monte_carlo_summary_rows(final_prices, quantiles):
+    """ Summary statistics and quantiles of simulated final prices. """
+    final_prices = np.asarray(final_prices, dtype=float)
+    yield ("Mean", float(np.mean(final_prices)))
+    yield ("Std Dev", float(np.std(final_prices)))
+    yield ("Min", float(np.min(final_prices)))
+    yield ("Max", float(np.max(final_prices)))
+    for q, value in zip(quantiles, np.quantile(final_prices, quantiles)):
+        yield (f"Quantile {q:g}", float(value))
+
+def path_rows(paths, max_path_samples):
+    """ Long-format (Path, Step, Price) rows for the first max_path_samples paths (paths is num_steps x num_simulations). """
+    paths = np.asarray(paths)[:, :max_path_samples]
+    num_steps, num_paths = paths.shape
+    path_ids = np.repeat(np.arange(1, num_paths + 1), num_steps)
+    steps = np.tile(np.arange(num_steps), num_paths)
+    return iter_array_rows(path_ids, steps, paths.T.ravel())
+
+def default_output_file(excel_file):
+    """ Results workbook next to the input, e.g. Database.xlsx -> Database Results.xlsx. """
+    stem, ext = os.path.splitext(excel_file)
+    return f"{stem} {RESULT_PREFIX}{ext or '.xlsx'}"
+
+def export_results(excel_file, results=None, bs_chain=None, final_prices=None, paths=None,
+                   quantiles=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99), max_path_samples=100, output_file=None,
+                   overwrite=False):
+    """
+    Write the input sheets of a workbook plus result sheets to an output workbook.
+
+    Parameters:
+        excel_file (str): Workbook whose input sheets are carried over.
+        results (dict or None): Nested results from integrated_model (CAPM, Monte Carlo, Black-Scholes, Accuracy).
+        bs_chain (dict or DataFrame or None): Columns of a Black-Scholes chain, e.g. from black_scholes_chain.
+        final_prices (array-like or None): Simulated final prices for the Monte Carlo summary.
+        paths (ndarray or None): Simulated paths (num_steps x num_simulations); a sample is written in long format.
+        quantiles (tuple): Quantiles of the final prices to report.
+        max_path_samples (int): Number of paths written from `paths`.
+        output_file (str or None): Destination (default: default_output_file(excel_file)).
+        overwrite (bool): Allow output_file to be excel_file itself (formatting of the input sheets is lost).
+
+    Returns:
+        dict: Sheet name -> number of data rows written.
+    """
+    output_file = output_file or default_output_file(excel_file)
+    if os.path.abspath(output_file) == os.path.abspath(excel_file) and not overwrite:
+        raise ValueError(f"Exporting would overwrite '{excel_file}', pass overwrite=True to replace it in place.")
+    workbook = Workbook(write_only=True)
+    written = {}
+
+    # Carry over the input sheets, dropping result sheets from a previous export
+    if os.path.exists(excel_file) and os.path.getsize(excel_file) > 0:
+        source = load_workbook(excel_file, read_only=True)
+        try:
+            for source_sheet in source.worksheets:
+                if source_sheet.title.startswith(RESULT_PREFIX):
+                    continue
+                sheet = workbook.create_sheet(source_sheet.title)
+                for row in source_sheet.iter_rows(values_only=True):
+                    sheet.append(row)
+        finally:
+            source.close()
+
+    if results is not None:
+        written[f"{RESULT_PREFIX} Summary"] = write_table(
+            workbook, f"{RESULT_PREFIX} Summary", ["Model", "Metric", "Value"], summary_rows(results))
+
+    if bs_chain is not None:
+        header = list(bs_chain.keys())
+        written[f"{RESULT_PREFIX} BS Chain"] = write_table(
+            workbook, f"{RESULT_PREFIX} BS Chain", header, iter_array_rows(*(bs_chain[name] for name in header)))
+
+    if final_prices is not None:
+        written[f"{RESULT_PREFIX} MC Summary"] = write_table(
+            workbook, f"{RESULT_PREFIX} MC Summary", ["Statistic", "Value"], monte_carlo_summary_rows(final_prices, quantiles))
+
+    if paths is not None:
+        written[f"{RESULT_PREFIX} MC Paths"] = write_table(
+            workbook, f"{RESULT_PREFIX} MC Paths", ["Path", "Step", "Price"], path_rows(paths, max_path_samples))
+
+    # Save next to the destination first so a failed export never leaves a half-written workbook
+    temp_file = output_file + ".tmp"
+    workbook.save(temp_file)
+    os.replace(temp_file, output_file)
+
+    return written
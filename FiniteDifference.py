@@ -0,0 +1,134 @@
+# FiniteDifference.py
+"""
+VARIABLES:
+    - S: Asset price grid S_j = j * dS, j = 0..M.
+    - V: Option value on the grid, stepped backwards from expiry in time-to-maturity tau.
+    - r, q, sigma: Risk-free rate, continuous dividend yield, volatility.
+
+PDE (in tau = time to maturity):
+    - V_tau = 0.5 * sigma^2 * S^2 * V_SS + (r - q) * S * V_S - r * V
+    - Crank-Nicolson (theta = 1/2) after a few fully implicit Rannacher steps that damp the payoff kink.
+    - Each time step is one tridiagonal (banded) solve over the whole grid.
+    - American exercise uses the penalty method: (A + P) V = b + P * payoff, with P large where V < payoff,
+      iterated until the set of exercised nodes stops changing.
+"""
+
+import numpy as np
+from scipy.linalg import solve_banded
+
+def _payoff(stock_prices, strike_price, option_type):
+    if option_type == 'call':
+        return np.maximum(stock_prices - strike_price, 0.0)
+    if option_type == 'put':
+        return np.maximum(strike_price - stock_prices, 0.0)
+    raise ValueError(f"Unknown option type '{option_type}', expected 'call' or 'put'.")
+
+def _boundaries(S_max, strike_price, tau, risk_free_rate, dividend_yield, option_type, american):
+    """ Option values at S = 0 and S = S_max for time to maturity tau. """
+    if option_type == 'call':
+        upper = S_max * np.exp(-dividend_yield * tau) - strike_price * np.exp(-risk_free_rate * tau)
+        if american:
+            upper = max(upper, S_max - strike_price)
+        return 0.0, upper
+    lower = strike_price if american else strike_price * np.exp(-risk_free_rate * tau)
+    return lower, 0.0
+
+def crank_nicolson_price(strike_price, time_to_maturity, risk_free_rate, volatility, dividend_yield=0,
+                         option_type='put', american=False, stock_prices=None, S_max=None,
+                         num_price_steps=400, num_time_steps=200, rannacher_steps=2, penalty=1e8, max_iterations=50):
+    """
+    Price a European or American option on a whole grid of spot prices in a single backward solve.
+
+    Parameters:
+        strike_price (float): Strike price of the option.
+        time_to_maturity (float): Time to expiration in years.
+        risk_free_rate (float): Annualized risk-free rate.
+        volatility (float): Annualized volatility.
+        dividend_yield (float): Continuous dividend yield (default 0).
+        option_type (str): 'call' or 'put'.
+        american (bool): Allow early exercise.
+        stock_prices (array-like or None): Spot prices to report at (interpolated from the grid). None returns the grid.
+        S_max (float or None): Upper edge of the grid (default: well beyond the strike and the requested spots).
+        num_price_steps (int): Number of grid intervals in S.
+        num_time_steps (int): Number of time steps.
+        rannacher_steps (int): Fully implicit steps taken first to smooth the payoff.
+        penalty (float): Penalty weight enforcing V >= payoff for American options.
+        max_iterations (int): Maximum penalty iterations per time step.
+
+    Returns:
+        dict: 'Stock Prices', 'Option Prices', 'Delta' and 'Gamma' arrays.
+    """
+    r, q, sigma = risk_free_rate, dividend_yield, volatility
+    if S_max is None:
+        S_max = strike_price * np.exp(5 * sigma * np.sqrt(time_to_maturity))
+        if stock_prices is not None:
+            S_max = max(S_max, 2 * np.max(stock_prices))
+        S_max = max(S_max, 2 * strike_price)
+
+    M = num_price_steps
+    grid = np.linspace(0.0, S_max, M + 1)
+    dS = grid[1]
+    dt = time_to_maturity / num_time_steps
+
+    payoff = _payoff(grid, strike_price, option_type)
+    V = payoff.copy()
+
+    # Spatial operator L on the interior nodes j = 1..M-1 (in units of S_j = j * dS)
+    j = np.arange(1, M)
+    lower = 0.5 * (sigma ** 2 * j ** 2 - (r - q) * j)
+    diag = -(sigma ** 2 * j ** 2 + r)
+    upper = 0.5 * (sigma ** 2 * j ** 2 + (r - q) * j)
+
+    def apply_L(values):
+        return lower * values[:-2] + diag * values[1:-1] + upper * values[2:]
+
+    for n in range(num_time_steps):
+        theta = 1.0 if n < rannacher_steps else 0.5
+        tau_new = (n + 1) * dt
+        V0_new, VM_new = _boundaries(S_max, strike_price, tau_new, r, q, option_type, american)
+
+        # Right-hand side: explicit part plus the implicit boundary contributions
+        rhs = V[1:-1] + (1 - theta) * dt * apply_L(V)
+        rhs[0] += theta * dt * lower[0] * V0_new
+        rhs[-1] += theta * dt * upper[-1] * VM_new
+
+        # Banded storage of (I - theta * dt * L): rows are upper, main and lower diagonals
+        ab = np.zeros((3, M - 1))
+        ab[0, 1:] = -theta * dt * upper[:-1]
+        ab[1] = 1 - theta * dt * diag
+        ab[2, :-1] = -theta * dt * lower[1:]
+
+        interior = solve_banded((1, 1), ab, rhs)
+
+        if american:
+            # Penalty iteration: re-solve with a large diagonal wherever the option is below its exercise value
+            exercise_value = payoff[1:-1]
+            active = interior < exercise_value
+            for _ in range(max_iterations):
+                if not np.any(active):
+                    break
+                ab_penalty = ab.copy()
+                ab_penalty[1] += penalty * active
+                interior = solve_banded((1, 1), ab_penalty, rhs + penalty * active * exercise_value)
+                new_active = interior < exercise_value
+                if np.array_equal(new_active, active):
+                    break
+                active = new_active
+            interior = np.maximum(interior, exercise_value)
+
+        V = np.concatenate(([V0_new], interior, [VM_new]))
+
+    # Grid Greeks from central differences (one-sided at the edges)
+    delta = np.gradient(V, dS)
+    gamma = np.gradient(delta, dS)
+
+    if stock_prices is None:
+        return {'Stock Prices': grid, 'Option Prices': V, 'Delta': delta, 'Gamma': gamma}
+
+    stock_prices = np.asarray(stock_prices, dtype=float)
+    return {
+        'Stock Prices': stock_prices,
+        'Option Prices': np.interp(stock_prices, grid, V),
+        'Delta': np.interp(stock_prices, grid, delta),
+        'Gamma': np.interp(stock_prices, grid, gamma)
+    }
@@ -0,0 +1,109 @@
+# LongstaffSchwartz.py
+import numpy as np
+from scipy.stats import norm
+from BlackScholes import black_scholes_call_div, black_scholes_put_div
+from MonteCarloSim import GBMProcess
+
+"""
+LEAST-SQUARES MONTE CARLO (Longstaff-Schwartz):
+    - Simulate risk-neutral prices only at the exercise dates (MonteCarloSim.simulate_at_times).
+    - Step backwards through the dates: discount the realised cash flows one date, regress them on a small
+      basis of the current price over the in-the-money paths (one least-squares solve per date), and exercise
+      wherever the immediate payoff beats the fitted continuation value.
+    - Prices are scaled by the strike before building the basis so the regression stays well conditioned.
+    - If exercising at once beats the estimated value, every path takes the immediate payoff, so the
+      confidence interval is computed from the cash flows actually used.
+    - The estimate is reported with a normal confidence interval and next to the European price, which is a
+      lower bound for the American/Bermudan value: the closed form for a GBMProcess, otherwise the discounted
+      mean payoff of the same simulated paths at the last exercise date.
+"""
+
+def _basis(x, degree, basis):
+    if basis == 'laguerre':
+        return np.polynomial.laguerre.lagvander(x, degree)
+    if basis == 'polynomial':
+        return np.polynomial.polynomial.polyvander(x, degree)
+    raise ValueError(f"Unknown basis '{basis}', expected 'laguerre' or 'polynomial'.")
+
+def longstaff_schwartz(mc_sim, strike_price, risk_free_rate, option_type='put', exercise_times=None,
+                       num_exercise_dates=50, dividend_yield=0, degree=3, basis='laguerre', confidence=0.95, rng=np.random):
+    """
+    Price an American (or Bermudan) option on MonteCarloSim paths.
+
+    Parameters:
+        mc_sim (MonteCarloSim): Simulator providing S0, T, volatility, path count and the process kernel.
+            Its drift is replaced by the risk-neutral r - q.
+        strike_price (float): Strike price of the option.
+        risk_free_rate (float): Annualized risk-free rate.
+        option_type (str): 'call' or 'put'.
+        exercise_times (array-like or None): Exercise dates in years (default: num_exercise_dates evenly spaced up to T).
+        num_exercise_dates (int): Number of exercise dates when exercise_times is None.
+        dividend_yield (float): Continuous dividend yield.
+        degree (int): Highest degree of the regression basis.
+        basis (str): 'laguerre' or 'polynomial'.
+        confidence (float): Confidence level of the reported interval.
+        rng: Random source passed to the simulator.
+
+    Returns:
+        dict: 'Price', 'Std Error', 'Confidence Interval', 'European Price' (at the last exercise date)
+              and 'Early Exercise Premium'.
+    """
+    if option_type == 'call':
+        payoff = lambda prices: np.maximum(prices - strike_price, 0.0)
+    elif option_type == 'put':
+        payoff = lambda prices: np.maximum(strike_price - prices, 0.0)
+    else:
+        raise ValueError(f"Unknown option type '{option_type}', expected 'call' or 'put'.")
+
+    if exercise_times is None:
+        exercise_times = np.linspace(mc_sim.T / num_exercise_dates, mc_sim.T, num_exercise_dates)
+    exercise_times = np.asarray(exercise_times, dtype=float)
+
+    # Only the exercise dates are stored (num_dates x num_simulations)
+    sim = mc_sim.risk_neutral(risk_free_rate - dividend_yield)
+    paths = sim.simulate_at_times(exercise_times, rng=rng)
+
+    # Cash flow of each path, valued at the date currently being processed
+    cash_flow = payoff(paths[-1])
+    for d in range(len(exercise_times) - 2, -1, -1):
+        cash_flow *= np.exp(-risk_free_rate * (exercise_times[d + 1] - exercise_times[d]))
+        exercise_value = payoff(paths[d])
+        itm = np.flatnonzero(exercise_value > 0)
+        if len(itm) <= degree + 1:
+            continue
+
+        # One least-squares fit of the continuation value over the in-the-money paths, via the
+        # (degree+1)-square normal equations rather than a factorisation of the tall basis matrix
+        X = _basis(paths[d, itm] / strike_price, degree, basis)
+        coefficients, *_ = np.linalg.lstsq(X.T @ X, X.T @ cash_flow[itm], rcond=None)
+        continuation = X @ coefficients
+
+        exercise = itm[exercise_value[itm] > continuation]
+        cash_flow[exercise] = exercise_value[exercise]
+
+    discounted = cash_flow * np.exp(-risk_free_rate * exercise_times[0])
+
+    # Exercising immediately is always available; when it wins, it is the cash flow of every path
+    immediate = float(payoff(np.float64(mc_sim.S0)))
+    if immediate > np.mean(discounted):
+        discounted = np.full(len(discounted), immediate)
+
+    price = np.mean(discounted)
+    std_error = np.std(discounted, ddof=1) / np.sqrt(len(discounted))
+    z = norm.ppf(0.5 + confidence / 2)
+
+    maturity = exercise_times[-1]
+    if isinstance(sim.process, GBMProcess):
+        european = black_scholes_put_div if option_type == 'put' else black_scholes_call_div
+        european_price = european(mc_sim.S0, strike_price, maturity, risk_free_rate, dividend_yield, sim.process.sigma)
+    else:
+        # No closed form for the other kernels, so hold every path to the last date
+        european_price = np.exp(-risk_free_rate * maturity) * np.mean(payoff(paths[-1]))
+
+    return {
+        'Price': price,
+        'Std Error': std_error,
+        'Confidence Interval': (price - z * std_error, price + z * std_error),
+        'European Price': european_price,
+        'Early Exercise Premium': price - european_price
+    }
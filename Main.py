@@ -3,15 +3,18 @@ import numpy as np
 import pandas as pd
 import json
 import unittest
-from ExcelParse import parse_sheets
+from ExcelParse import parse_capm_sheet, parse_black_scholes_sheet, parse_monte_carlo_sheet
 from MonteCarloSim import MonteCarloSim
-from BlackScholes import black_scholes_call, black_scholes_put, black_scholes_call_div, black_scholes_put_div
+from BlackScholes import black_scholes_call, black_scholes_put, black_scholes_call_div, black_scholes_put_div, black_scholes_chain
 from Capm import CalcExpectedReturn, CalcBeta, Normalize, CalcMonthlyReturn
 from Plotter import plot_normalized_prices, plot_paths, plot_histogram, plot_with_ITM_ATM_OTM
-from AccuracyTest import test_capm_accuracy, test_monte_carlo_accuracy
+from AccuracyTest import calc_capm_accuracy, print_capm_accuracy, test_monte_carlo_accuracy
+from Pipeline import Pipeline, Stage, file_version
+from ExcelExport import export_results
+from Volatility import estimate_volatility
 
 # Import test cases
-from Test import TestBlackScholes, TestCapm, TestMonteCarloSim
+from Test import TestBlackScholes, TestCapm, TestMonteCarloSim, TestProcessKernels, TestObservationDates, TestBacktest, TestPipeline, TestFiniteDifference, TestMonteCarloGreeks, TestExcelExport, TestPriceStore, TestVolatility, TestLongstaffSchwartz
 
 def save_json(data, filename="IntegratedModel.json"):
     """ Save calculated data to JSON file """
@@ -23,39 +26,150 @@ def save_json(data, filename="IntegratedModel.json"):
     except Exception as e:
         print(f"Error saving data to JSON: {e}")
 
-def integrated_model(excel_file, capm_sheets, bs_sheet, mc_sheet):
-    # Parse all required sheets from excel
-    data = parse_sheets(excel_file, capm_sheets, bs_sheet, mc_sheet)
-    results = {}
+# ---- Pipeline Stages ---- #
+# workbook_version is only part of the cache key: it changes when Database.xlsx is edited.
 
-    # ---- CAPM Workflow ---- #
-    print("=" * 80)
-    print("CAPM ANALYSIS")
-    print("=" * 80)
-    capm_data = data["CAPM"]
-    stock_data = capm_data["CAPM Sheet"]
+def stage_parse_capm(excel_file, workbook_version, capm_sheets):
+    return parse_capm_sheet(excel_file, capm_sheets)
+
+def stage_parse_black_scholes(excel_file, workbook_version, bs_sheet):
+    return parse_black_scholes_sheet(excel_file, bs_sheet)
+
+def stage_parse_monte_carlo(excel_file, workbook_version, mc_sheet):
+    return parse_monte_carlo_sheet(excel_file, mc_sheet)
+
+def stage_capm(capm_data, capm_risk_free_rate, market_return):
+    stock_data = capm_data["CAPM Sheet"].copy()
 
     # Normalize and calculate returns
     normalized_data = Normalize(stock_data)
     stock_returns = CalcMonthlyReturn(stock_data)
-    market_data = capm_data["CAPM Sheet"]
+    market_data = capm_data["CAPM Sheet"].copy()
     market_returns = CalcMonthlyReturn(market_data)
 
-    # Display normalized prices and returns (Only once)
-    print("Normalized Prices and Monthly Returns:")
     combined_data = normalized_data[['Date', 'Price', 'Normalized Price']].copy()
     combined_data['Monthly Return'] = stock_returns['Monthly Return']  # Add Monthly Return to the dataframe
-    print(combined_data.head())
-    print("-" * 80)
-
-    # Plot normalized prices
-    plot_normalized_prices(normalized_data, stock_name="APPL-US")
 
     # Calculate beta and expected return
     beta = CalcBeta(stock_returns['Monthly Return'], market_returns['Monthly Return'])
-    risk_free_rate = 0.0442  # Three Month U.S.A Treasury Bill
-    market_return = 0.0990  # Expected Return S&P500
-    expected_return = CalcExpectedReturn(risk_free_rate, beta, market_return)
+    expected_return = CalcExpectedReturn(capm_risk_free_rate, beta, market_return)
+    return normalized_data, combined_data, beta, expected_return
+
+def stage_volatility(capm_data, volatility_method):
+    # None keeps the volatilities typed into the Monte Carlo and Black-Scholes sheets
+    if volatility_method is None:
+        return None
+    stock_data = capm_data["CAPM Sheet"].sort_values(by='Date')
+    return estimate_volatility(stock_data['Price'].values, method=volatility_method, periods_per_year=12)
+
+def stage_monte_carlo(mc_data, expected_return, estimated_volatility):
+    sigma = mc_data["sigma"] if estimated_volatility is None else estimated_volatility
+    mc_sim = MonteCarloSim(
+        S0=mc_data["S0"], mu=expected_return, sigma=sigma, 
+        T=mc_data["T"], num_simulations=mc_data["num_simulations"], num_steps=mc_data["num_steps"]
+    )
+    simulated_paths = mc_sim.simulate_paths()
+    expected_final_price = mc_sim.calc_expected_final_price(simulated_paths)
+    mc_volatility = mc_sim.calc_volatility_from_paths(simulated_paths)
+    return simulated_paths, expected_final_price, mc_volatility
+
+def stage_black_scholes_inputs(bs_sheet_data, bs_overrides, estimated_volatility):
+    # Values passed in bs_overrides replace the ones read from the sheet (and the estimated volatility)
+    bs_data = dict(bs_sheet_data)
+    if estimated_volatility is not None:
+        bs_data["Volatility"] = estimated_volatility
+    bs_data.update(bs_overrides or {})
+    return bs_data
+
+def stage_black_scholes(bs_data):
+    stock_price = bs_data["Stock Price"]
+    strike_price = bs_data["Strike Price"]
+    time_to_maturity = bs_data["Time to Maturity"]
+    risk_free_rate = bs_data["Risk-Free Rate"]
+    volatility = bs_data["Volatility"]
+    dividend_yield = bs_data["Dividend Yield"]
+
+    return {
+        "Call Price": black_scholes_call(stock_price, strike_price, time_to_maturity, risk_free_rate, volatility),
+        "Put Price": black_scholes_put(stock_price, strike_price, time_to_maturity, risk_free_rate, volatility),
+        "Call Price with Dividends": black_scholes_call_div(stock_price, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility),
+        "Put Price with Dividends": black_scholes_put_div(stock_price, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility)
+    }
+
+def stage_black_scholes_rate(bs_data):
+    # The accuracy stage only needs the rate, so other Black-Scholes inputs don't invalidate it
+    return bs_data["Risk-Free Rate"]
+
+def stage_accuracy(capm_data, bs_risk_free_rate, market_return, beta, simulated_paths):
+    data = {"CAPM": {name: df.copy() for name, df in capm_data.items()}}
+
+    # Extract historical prices for Monte Carlo testing
+    historical_prices_df = capm_data["CAPM Sheet"].copy()
+    historical_prices_df['Date'] = pd.to_datetime(historical_prices_df['Date'])  # Ensure 'Date' is a datetime object
+    historical_prices_df = historical_prices_df.sort_values(by='Date', ascending=False).head(50)
+
+    # The CAPM check uses the Black-Scholes sheet's risk-free rate
+    capm_accuracy = calc_capm_accuracy(data, bs_risk_free_rate, market_return, beta)
+    mc_rmse = test_monte_carlo_accuracy(simulated_paths, data, historical_prices_df)
+    return capm_accuracy, mc_rmse
+
+def build_integrated_pipeline(cache_dir=None, max_workers=None):
+    """
+    Stage graph behind integrated_model.
+    Black-Scholes only depends on its own sheet, so it runs alongside CAPM and Monte Carlo.
+    """
+    stages = [
+        Stage("parse_capm", stage_parse_capm, ["excel_file", "workbook_version", "capm_sheets"], ["capm_data"]),
+        Stage("parse_black_scholes", stage_parse_black_scholes, ["excel_file", "workbook_version", "bs_sheet"], ["bs_sheet_data"]),
+        Stage("parse_monte_carlo", stage_parse_monte_carlo, ["excel_file", "workbook_version", "mc_sheet"], ["mc_data"]),
+        Stage("capm", stage_capm, ["capm_data", "capm_risk_free_rate", "market_return"],
+              ["normalized_data", "combined_data", "beta", "expected_return"]),
+        Stage("volatility", stage_volatility, ["capm_data", "volatility_method"], ["estimated_volatility"]),
+        Stage("monte_carlo", stage_monte_carlo, ["mc_data", "expected_return", "estimated_volatility"],
+              ["simulated_paths", "expected_final_price", "mc_volatility"]),
+        Stage("black_scholes_inputs", stage_black_scholes_inputs, ["bs_sheet_data", "bs_overrides", "estimated_volatility"], ["bs_data"]),
+        Stage("black_scholes", stage_black_scholes, ["bs_data"], ["bs_prices"]),
+        Stage("black_scholes_rate", stage_black_scholes_rate, ["bs_data"], ["bs_risk_free_rate"]),
+        Stage("accuracy", stage_accuracy, ["capm_data", "bs_risk_free_rate", "market_return", "beta", "simulated_paths"],
+              ["capm_accuracy", "mc_rmse"]),
+    ]
+    return Pipeline(stages, cache_dir=cache_dir, max_workers=max_workers)
+
+# Shared across calls so repeated runs in one session reuse unchanged stages (only the latest result per stage is kept)
+INTEGRATED_PIPELINE = build_integrated_pipeline()
+
+def integrated_model(excel_file, capm_sheets, bs_sheet, mc_sheet, bs_overrides=None, pipeline=None, export_excel=False,
+                     volatility_method=None, export_file="IntegratedModel.xlsx", overwrite_excel=False):
+    # Run (or reuse) every stage of the model, then report in the usual order
+    pipeline = pipeline or INTEGRATED_PIPELINE
+    values = pipeline.run({
+        "excel_file": excel_file,
+        "workbook_version": file_version(excel_file),
+        "capm_sheets": list(capm_sheets),
+        "bs_sheet": bs_sheet,
+        "mc_sheet": mc_sheet,
+        "capm_risk_free_rate": 0.0442,  # Three Month U.S.A Treasury Bill
+        "market_return": 0.0990,  # Expected Return S&P500
+        "bs_overrides": bs_overrides or {},
+        "volatility_method": volatility_method  # 'close_to_close', 'ewma' or 'garch' estimates sigma from the CAPM prices
+    })
+    results = {}
+
+    # ---- CAPM Workflow ---- #
+    print("=" * 80)
+    print("CAPM ANALYSIS")
+    print("=" * 80)
+    normalized_data = values["normalized_data"]
+    beta = values["beta"]
+    expected_return = values["expected_return"]
+
+    # Display normalized prices and returns (Only once)
+    print("Normalized Prices and Monthly Returns:")
+    print(values["combined_data"].head())
+    print("-" * 80)
+
+    # Plot normalized prices
+    plot_normalized_prices(normalized_data.copy(), stock_name="APPL-US")
 
     print(f"Beta: {beta:.4f}")
     print(f"Expected Return (CAPM): {expected_return:.4f}")
@@ -70,14 +184,9 @@ def integrated_model(excel_file, capm_sheets, bs_sheet, mc_sheet):
     print("MONTE CARLO SIMULATION & GEOMETRIC BROWNIAN MOTION")
     print("=" * 80)
 
-    mc_data = data["Monte Carlo"]
-    mc_sim = MonteCarloSim(
-        S0=mc_data["S0"], mu=expected_return, sigma=mc_data["sigma"], 
-        T=mc_data["T"], num_simulations=mc_data["num_simulations"], num_steps=mc_data["num_steps"]
-    )
-    simulated_paths = mc_sim.simulate_paths()
-    expected_final_price = mc_sim.calc_expected_final_price(simulated_paths)
-    mc_volatility = mc_sim.calc_volatility_from_paths(simulated_paths)
+    simulated_paths = values["simulated_paths"]
+    expected_final_price = values["expected_final_price"]
+    mc_volatility = values["mc_volatility"]
 
     # Sample paths
     print("Sample of Simulated Price Paths (First 5):")
@@ -100,55 +209,35 @@ def integrated_model(excel_file, capm_sheets, bs_sheet, mc_sheet):
         "Expected Final Price": expected_final_price,
         "Volatility": mc_volatility
     }
-    
-    # Extract historical prices for Monte Carlo testing
-    historical_prices_df = capm_data["CAPM Sheet"].copy()
-    historical_prices_df['Date'] = pd.to_datetime(historical_prices_df['Date'])  # Ensure 'Date' is a datetime object
-    historical_prices_df = historical_prices_df.sort_values(by='Date', ascending=False).head(50)
 
     # ---- Black-Scholes Workflow ---- #
     print("=" * 80)
     print("BLACK-SCHOLES OPTION PRICING")
     print("=" * 80)
 
-    bs_data = data["Black-Scholes"]
-    stock_price = bs_data["Stock Price"]
-    strike_price = bs_data["Strike Price"]
-    time_to_maturity = bs_data["Time to Maturity"]
-    risk_free_rate = bs_data["Risk-Free Rate"]
-    volatility = bs_data["Volatility"]
-    dividend_yield = bs_data["Dividend Yield"]
-
-    call_price = black_scholes_call(stock_price, strike_price, time_to_maturity, risk_free_rate, volatility)
-    put_price = black_scholes_put(stock_price, strike_price, time_to_maturity, risk_free_rate, volatility)
-    call_price_div = black_scholes_call_div(stock_price, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility)
-    put_price_div = black_scholes_put_div(stock_price, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility)
+    bs_data = values["bs_data"]
+    bs_prices = values["bs_prices"]
 
-    print(f"Call Option Price: {call_price:.4f}")
-    print(f"Put Option Price: {put_price:.4f}")
-    print(f"Call Option Price with Dividend Yield: {call_price_div:.4f}")
-    print(f"Put Option Price with Dividend Yield: {put_price_div:.4f}")
+    print(f"Call Option Price: {bs_prices['Call Price']:.4f}")
+    print(f"Put Option Price: {bs_prices['Put Price']:.4f}")
+    print(f"Call Option Price with Dividend Yield: {bs_prices['Call Price with Dividends']:.4f}")
+    print(f"Put Option Price with Dividend Yield: {bs_prices['Put Price with Dividends']:.4f}")
 
     # Plot option prices with ITM, ATM, OTM regions
-    plot_with_ITM_ATM_OTM(stock_name="APPL-US", stock_price=stock_price, strike_price=strike_price,
-                          time_to_maturity=time_to_maturity, risk_free_rate=risk_free_rate, volatility=volatility, 
-                          dividend_yield=dividend_yield)
-
-    results["Black-Scholes"] = {
-        "Call Price": call_price,
-        "Put Price": put_price,
-        "Call Price with Dividends": call_price_div,
-        "Put Price with Dividends": put_price_div
-    }
+    plot_with_ITM_ATM_OTM(stock_name="APPL-US", stock_price=bs_data["Stock Price"], strike_price=bs_data["Strike Price"],
+                          time_to_maturity=bs_data["Time to Maturity"], risk_free_rate=bs_data["Risk-Free Rate"],
+                          volatility=bs_data["Volatility"], dividend_yield=bs_data["Dividend Yield"])
+
+    results["Black-Scholes"] = dict(bs_prices)
 
     # ---- Accuracy Tests ---- #
     print("=" * 80)
     print("ACCURACY TESTS")
     print("=" * 80)
 
-    # Run accuracy tests
-    capm_mape = test_capm_accuracy(data, risk_free_rate, market_return, beta)
-    mc_rmse = test_monte_carlo_accuracy(simulated_paths, data, historical_prices_df)
+    print_capm_accuracy(values["capm_accuracy"])
+    capm_mape = values["capm_accuracy"]["MAPE"]
+    mc_rmse = values["mc_rmse"]
     print(f"CAPM MAPE: {capm_mape:.2f}%")
     print(f"Monte Carlo RMSE: ${mc_rmse:.2f}")
 
@@ -161,6 +250,15 @@ def integrated_model(excel_file, capm_sheets, bs_sheet, mc_sheet):
     # ---- Save Results to JSON ---- #
     save_json(results)
 
+    # ---- Write Results to a Workbook (the input workbook only when overwrite_excel is set) ---- #
+    if export_excel:
+        strike_prices = np.linspace(bs_data["Strike Price"] * 0.5, bs_data["Strike Price"] * 1.5, 101)
+        bs_chain = black_scholes_chain(bs_data["Stock Price"], strike_prices, bs_data["Time to Maturity"],
+                                       bs_data["Risk-Free Rate"], bs_data["Volatility"], bs_data["Dividend Yield"])
+        export_results(excel_file, results, bs_chain=bs_chain, final_prices=final_prices, paths=simulated_paths,
+                       output_file=export_file, overwrite=overwrite_excel)
+        print(f"Results written to {export_file}")
+
     return results
 
 def main():
@@ -191,7 +289,17 @@ def main():
     test_suites = [
         unittest.TestLoader().loadTestsFromTestCase(TestBlackScholes),
         unittest.TestLoader().loadTestsFromTestCase(TestCapm),
-        unittest.TestLoader().loadTestsFromTestCase(TestMonteCarloSim)
+        unittest.TestLoader().loadTestsFromTestCase(TestMonteCarloSim),
+        unittest.TestLoader().loadTestsFromTestCase(TestProcessKernels),
+        unittest.TestLoader().loadTestsFromTestCase(TestObservationDates),
+        unittest.TestLoader().loadTestsFromTestCase(TestBacktest),
+        unittest.TestLoader().loadTestsFromTestCase(TestPipeline),
+        unittest.TestLoader().loadTestsFromTestCase(TestFiniteDifference),
+        unittest.TestLoader().loadTestsFromTestCase(TestMonteCarloGreeks),
+        unittest.TestLoader().loadTestsFromTestCase(TestExcelExport),
+        unittest.TestLoader().loadTestsFromTestCase(TestPriceStore),
+        unittest.TestLoader().loadTestsFromTestCase(TestVolatility),
+        unittest.TestLoader().loadTestsFromTestCase(TestLongstaffSchwartz)
     ]
     all_tests = unittest.TestSuite(test_suites)
 
@@ -1,8 +1,147 @@
 # MonteCarloSim.py
+import copy
 import numpy as np
 
+"""
+PROCESS KERNELS:
+    - Each kernel advances a whole batch of simulations by one step of size dt.
+    - step(S, state, dt, rng) returns the new prices and the new process state.
+    - exact = True means the transition law is sampled exactly, so the kernel can
+      jump straight between observation dates with a single step of any size.
+    - rng is anything exposing standard_normal/poisson/uniform (np.random or a Generator).
+"""
+class GBMProcess:
+    exact = True
+
+    def __init__(self, mu, sigma):
+        self.mu = mu  # Drift
+        self.sigma = sigma  # Volatility
+
+    def init_state(self, num_simulations):
+        # GBM carries no state besides the price
+        return None
+
+    def step(self, S, state, dt, rng=np.random):
+        Z = rng.standard_normal(S.shape[0])
+        # Exact log-normal transition: S(t+dt) = S(t) * exp((mu - sigma^2/2)dt + sigma*root(dt)*Z)
+        return S * np.exp((self.mu - 0.5 * self.sigma ** 2) * dt + self.sigma * np.sqrt(dt) * Z), state
+
+    def bridge(self, x_left, x_right, t_left, t_right, t, rng=np.random):
+        """
+        Sample the log price at time t given the log prices at t_left < t < t_right.
+        The Brownian bridge has mean linear in time and variance sigma^2(t - t_left)(t_right - t)/(t_right - t_left).
+        """
+        w = (t - t_left) / (t_right - t_left)
+        std = self.sigma * np.sqrt((t - t_left) * (t_right - t) / (t_right - t_left))
+        return x_left + w * (x_right - x_left) + std * rng.standard_normal(x_left.shape[0])
+
+
+class MertonJumpProcess:
+    """
+    Merton jump-diffusion: GBM plus compound Poisson jumps with log-normal sizes.
+
+    Parameters:
+        mu (float): Drift of the price (jump compensated).
+        sigma (float): Diffusion volatility.
+        jump_intensity (float): Expected number of jumps per year (lambda).
+        jump_mean (float): Mean of the log jump size.
+        jump_vol (float): Standard deviation of the log jump size.
+    """
+    exact = True
+
+    def __init__(self, mu, sigma, jump_intensity, jump_mean, jump_vol):
+        self.mu = mu
+        self.sigma = sigma
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_vol = jump_vol
+        # Compensator k = E[e^J - 1] keeps the expected growth rate at mu
+        self.k = np.exp(jump_mean + 0.5 * jump_vol ** 2) - 1
+
+    def init_state(self, num_simulations):
+        return None
+
+    def step(self, S, state, dt, rng=np.random):
+        n = S.shape[0]
+        Z = rng.standard_normal(n)
+        # Number of jumps in the step for every path, drawn in one batch
+        N = rng.poisson(self.jump_intensity * dt, n)
+        # Sum of N normal jump sizes is N(N*m, N*v^2), so one normal draw per path covers all jumps
+        jumps = N * self.jump_mean + np.sqrt(N) * self.jump_vol * rng.standard_normal(n)
+        drift = (self.mu - self.jump_intensity * self.k - 0.5 * self.sigma ** 2) * dt
+        return S * np.exp(drift + self.sigma * np.sqrt(dt) * Z + jumps), state
+
+
+class HestonProcess:
+    """
+    Heston stochastic volatility discretised with Andersen's Quadratic-Exponential (QE) scheme.
+
+    Parameters:
+        mu (float): Drift of the price.
+        v0 (float): Initial variance.
+        kappa (float): Speed of mean reversion of the variance.
+        theta (float): Long-run variance.
+        xi (float): Volatility of the variance.
+        rho (float): Correlation between price and variance shocks.
+        psi_c (float): Switching threshold between the quadratic and exponential branches.
+    """
+    exact = False
+
+    def __init__(self, mu, v0, kappa, theta, xi, rho, psi_c=1.5):
+        self.mu = mu
+        self.v0 = v0
+        self.kappa = kappa
+        self.theta = theta
+        self.xi = xi
+        self.rho = rho
+        self.psi_c = psi_c
+
+    def init_state(self, num_simulations):
+        return np.full(num_simulations, float(self.v0))
+
+    def step(self, S, state, dt, rng=np.random):
+        v = state
+        n = S.shape[0]
+        kappa, theta, xi, rho = self.kappa, self.theta, self.xi, self.rho
+
+        # Conditional mean and variance of v(t+dt) given v(t)
+        e = np.exp(-kappa * dt)
+        m = theta + (v - theta) * e
+        s2 = v * xi ** 2 * e * (1 - e) / kappa + theta * xi ** 2 * (1 - e) ** 2 / (2 * kappa)
+        psi = s2 / np.maximum(m ** 2, 1e-300)
+
+        v_next = np.empty(n)
+        U = rng.uniform(size=n)
+        quad = psi <= self.psi_c
+
+        # Quadratic branch: v = a(b + Zv)^2
+        if np.any(quad):
+            inv = 2 / psi[quad]
+            b2 = inv - 1 + np.sqrt(inv) * np.sqrt(inv - 1)
+            a = m[quad] / (1 + b2)
+            Zv = rng.standard_normal(np.count_nonzero(quad))
+            v_next[quad] = a * (np.sqrt(b2) + Zv) ** 2
+
+        # Exponential branch: point mass at zero plus an exponential tail
+        expo = ~quad
+        if np.any(expo):
+            p = (psi[expo] - 1) / (psi[expo] + 1)
+            beta = (1 - p) / m[expo]
+            u = U[expo]
+            v_next[expo] = np.where(u <= p, 0.0, np.log((1 - p) / np.maximum(1 - u, 1e-300)) / beta)
+
+        # Log-price update with trapezoidal integrated variance (gamma1 = gamma2 = 1/2)
+        K0 = -rho * kappa * theta / xi * dt
+        K1 = 0.5 * dt * (kappa * rho / xi - 0.5) - rho / xi
+        K2 = 0.5 * dt * (kappa * rho / xi - 0.5) + rho / xi
+        K3 = 0.5 * dt * (1 - rho ** 2)
+        Z = rng.standard_normal(n)
+        log_step = self.mu * dt + K0 + K1 * v + K2 * v_next + np.sqrt(np.maximum(K3 * (v + v_next), 0)) * Z
+        return S * np.exp(log_step), v_next
+
+
 class MonteCarloSim:
-    def __init__(self, S0, mu, sigma, T, num_simulations, num_steps):
+    def __init__(self, S0, mu, sigma, T, num_simulations, num_steps, process=None):
         self.S0 = S0  # Initial stock price
         self.mu = mu  # Drift (expected return, typically from CAPM)
         self.sigma = sigma  # Volatility (std dev of returns)
@@ -10,23 +149,236 @@ class MonteCarloSim:
         self.num_simulations = num_simulations  # Number of simulated paths
         self.num_steps = num_steps  # Number of time steps
         self.dt = T / num_steps  # Time step size
-        
-    def simulate_paths(self):
+        # Stochastic process kernel (defaults to GBM built from mu and sigma)
+        self.process = process if process is not None else GBMProcess(mu, sigma)
+
+    def simulate_paths(self, rng=np.random):
         # Initialize an array to store price paths
         paths = np.zeros((self.num_steps, self.num_simulations))
         paths[0] = self.S0  # Set the initial stock price for all paths
-        
-        # Simulate each path
+        state = self.process.init_state(self.num_simulations)
+
+        # Advance all paths one step at a time with the process kernel
         for t in range(1, self.num_steps):
-            Z = np.random.standard_normal(self.num_simulations)  # Generate random values for Brownian Motion (Z ~ N(0, 1))
-            # Update the price for the next time step using GBM
-            paths[t] = paths[t - 1] * np.exp((self.mu - 0.5 * self.sigma ** 2) * self.dt + self.sigma * np.sqrt(self.dt) * Z)
-        
+            paths[t], state = self.process.step(paths[t - 1], state, self.dt, rng)
+
         # Remove outliers from simulated paths
         paths = self.remove_outliers_from_paths(paths)
-        
+
+        return paths
+
+    def simulate_terminal_prices(self, rng=np.random):
+        """
+        Simulate only the prices at maturity T.
+        Exact kernels cover [0, T] in a single step; the others fall back to num_steps steps.
+
+        Returns:
+            ndarray: Terminal prices (num_simulations,).
+        """
+        num_steps = 1 if self.process.exact else self.num_steps
+        dt = self.T / num_steps
+        prices = np.full(self.num_simulations, float(self.S0))
+        state = self.process.init_state(self.num_simulations)
+        for _ in range(num_steps):
+            prices, state = self.process.step(prices, state, dt, rng)
+        return prices
+
+    def simulate_at_times(self, times, rng=np.random):
+        """
+        Simulate prices only at the given observation times.
+        Exact kernels jump directly from one date to the next; the others step at most dt at a time.
+
+        Parameters:
+            times (array-like): Strictly increasing observation times in years (all > 0).
+
+        Returns:
+            ndarray: Simulated prices (len(times) x num_simulations), one row per observation time.
+        """
+        times = np.asarray(times, dtype=float)
+        if times.ndim != 1 or len(times) == 0 or times[0] <= 0 or np.any(np.diff(times) <= 0):
+            raise ValueError("Observation times must be positive and strictly increasing.")
+
+        paths = np.empty((len(times), self.num_simulations))
+        prices = np.full(self.num_simulations, float(self.S0))
+        state = self.process.init_state(self.num_simulations)
+
+        t_prev = 0.0
+        for i, t in enumerate(times):
+            gap = t - t_prev
+            substeps = 1 if self.process.exact else max(1, int(np.ceil(gap / self.dt - 1e-9)))
+            for _ in range(substeps):
+                prices, state = self.process.step(prices, state, gap / substeps, rng)
+            paths[i] = prices
+            t_prev = t
+
         return paths
 
+    def refine_paths(self, times, paths, fine_times, path_indices=None, rng=np.random):
+        """
+        Fill in prices at extra times between already simulated observation dates using a Brownian bridge.
+
+        Parameters:
+            times (array-like): Observation times the paths were simulated at.
+            paths (ndarray): Output of simulate_at_times (len(times) x num_simulations).
+            fine_times (array-like): Additional times in [0, times[-1]] to sample.
+            path_indices (array-like or None): Subset of simulations to refine (default: all).
+
+        Returns:
+            tuple: (grid, refined_paths) where grid is the sorted union of 0, times and fine_times
+                   and refined_paths has one row per grid time.
+        """
+        if not hasattr(self.process, 'bridge'):
+            raise TypeError(f"{type(self.process).__name__} does not support Brownian bridge refinement.")
+
+        times = np.asarray(times, dtype=float)
+        fine_times = np.asarray(fine_times, dtype=float)
+        if path_indices is not None:
+            paths = paths[:, path_indices]
+
+        # Coarse knots in log space, including the starting price at t = 0
+        knot_times = np.concatenate(([0.0], times))
+        knot_logs = np.vstack((np.full((1, paths.shape[1]), np.log(self.S0)), np.log(paths)))
+
+        grid = np.union1d(knot_times, fine_times)
+        if grid[0] < 0 or grid[-1] > knot_times[-1]:
+            raise ValueError("Refinement times must lie within the simulated observation window.")
+
+        # Walk the grid left to right; each new point is bridged between the last known point and the next knot
+        right = np.searchsorted(knot_times, grid)
+        refined = np.empty((len(grid), paths.shape[1]))
+        x_prev, t_prev = knot_logs[0], 0.0
+        for i, t in enumerate(grid):
+            k = right[i]
+            if knot_times[k] == t:
+                x = knot_logs[k]
+            else:
+                x = self.process.bridge(x_prev, knot_logs[k], t_prev, knot_times[k], t, rng)
+            refined[i] = x
+            x_prev, t_prev = x, t
+
+        return grid, np.exp(refined)
+
+    def risk_neutral(self, drift):
+        """ Copy of the simulator whose process drifts at the given rate (r - q for pricing). """
+        sim = copy.copy(self)
+        sim.mu = drift
+        sim.process = copy.copy(self.process)
+        sim.process.mu = drift
+        return sim
+
+    def calc_greeks(self, strike_price, risk_free_rate, option_type='call', method='pathwise', payoff=None,
+                    observation_times=None, dividend_yield=0, spot_bump=0.01, vol_bump=0.01, seed=None, rng=np.random):
+        """
+        Monte Carlo price, delta, gamma and vega from a single set of random draws (risk-neutral drift r - q).
+
+        Methods:
+            - 'pathwise': GBM terminal payoff of the vanilla option_type call/put (no custom payoff).
+              Pathwise delta and vega, likelihood-ratio/pathwise mixed gamma.
+            - 'likelihood_ratio': GBM with any terminal payoff (including digitals); the payoff is never differentiated.
+            Both terminal-only methods need a GBMProcess and use its sigma.
+            - 'finite_difference': any process and any payoff on the observation dates. Central bumps in S0 and
+              sigma all reuse the same seed (common random numbers), so the bump is not swamped by sampling noise.
+
+        Parameters:
+            strike_price (float): Strike of the default vanilla payoff.
+            risk_free_rate (float): Annualized risk-free rate (discounting and drift).
+            option_type (str): 'call' or 'put' for the default payoff.
+            method (str): 'pathwise', 'likelihood_ratio' or 'finite_difference'.
+            payoff (callable or None): Maps prices (num_observations x num_simulations) to one payoff per simulation.
+                Terminal-only methods pass the terminal prices as a single row.
+            observation_times (array-like or None): Dates passed to simulate_at_times for 'finite_difference' (default [T]).
+            dividend_yield (float): Continuous dividend yield.
+            spot_bump (float): Relative S0 bump for 'finite_difference'.
+            vol_bump (float): Absolute sigma bump for 'finite_difference'.
+            seed (int or None): Seed shared by every bumped scenario for 'finite_difference'.
+            rng: Random source for the terminal-only methods.
+
+        Returns:
+            dict: 'Price', 'Delta', 'Gamma' and 'Vega'.
+        """
+        if method in ('pathwise', 'likelihood_ratio'):
+            # The closed-form terminal draw and score functions below only hold for GBM
+            if not isinstance(self.process, GBMProcess):
+                raise ValueError(f"Method '{method}' needs a GBMProcess, use method='finite_difference' "
+                                 f"for {type(self.process).__name__}.")
+            if method == 'pathwise' and payoff is not None:
+                raise ValueError("Method 'pathwise' differentiates the vanilla option_type payoff, "
+                                 "use 'likelihood_ratio' or 'finite_difference' for a custom payoff.")
+
+        if payoff is None:
+            if option_type == 'call':
+                payoff = lambda prices: np.maximum(prices[-1] - strike_price, 0.0)
+            elif option_type == 'put':
+                payoff = lambda prices: np.maximum(strike_price - prices[-1], 0.0)
+            else:
+                raise ValueError(f"Unknown option type '{option_type}', expected 'call' or 'put'.")
+
+        S0, T = self.S0, self.T
+        discount = np.exp(-risk_free_rate * T)
+
+        if method == 'finite_difference':
+            return self._calc_greeks_finite_difference(payoff, risk_free_rate - dividend_yield, discount,
+                                                       observation_times, spot_bump, vol_bump, seed)
+
+        # Terminal GBM prices from one vector of normal draws
+        sigma = self.process.sigma
+        Z = rng.standard_normal(self.num_simulations)
+        S_T = S0 * np.exp((risk_free_rate - dividend_yield - 0.5 * sigma ** 2) * T + sigma * np.sqrt(T) * Z)
+        values = payoff(S_T[None, :])
+        price = discount * np.mean(values)
+
+        if method == 'pathwise':
+            if option_type == 'call':
+                slope = (S_T > strike_price).astype(float)
+            elif option_type == 'put':
+                slope = -(S_T < strike_price).astype(float)
+            else:
+                raise ValueError(f"Unknown option type '{option_type}', expected 'call' or 'put'.")
+            # dS_T/dS0 = S_T/S0 and dS_T/dsigma = S_T(ln(S_T/S0) - (r - q + sigma^2/2)T)/sigma
+            dST_dsigma = S_T * (np.log(S_T / S0) - (risk_free_rate - dividend_yield + 0.5 * sigma ** 2) * T) / sigma
+            delta = discount * np.mean(slope * S_T / S0)
+            gamma = discount * np.mean(slope * S_T / S0 ** 2 * (Z / (sigma * np.sqrt(T)) - 1))
+            vega = discount * np.mean(slope * dST_dsigma)
+        elif method == 'likelihood_ratio':
+            # Score functions of the log-normal density with respect to S0 and sigma
+            delta = discount * np.mean(values * Z / (S0 * sigma * np.sqrt(T)))
+            gamma = discount * np.mean(values * (Z ** 2 - 1 - Z * sigma * np.sqrt(T)) / (S0 ** 2 * sigma ** 2 * T))
+            vega = discount * np.mean(values * ((Z ** 2 - 1) / sigma - Z * np.sqrt(T)))
+        else:
+            raise ValueError(f"Unknown method '{method}', expected 'pathwise', 'likelihood_ratio' or 'finite_difference'.")
+
+        return {'Price': price, 'Delta': delta, 'Gamma': gamma, 'Vega': vega}
+
+    def _calc_greeks_finite_difference(self, payoff, risk_neutral_drift, discount, observation_times,
+                                       spot_bump, vol_bump, seed):
+        """ Central finite-difference Greeks with common random numbers across the bumped scenarios. """
+        if seed is None:
+            seed = np.random.randint(0, 2 ** 31 - 1)
+        times = [self.T] if observation_times is None else observation_times
+
+        def scenario_price(S0, sigma=None):
+            sim = self.risk_neutral(risk_neutral_drift)
+            sim.S0 = S0
+            if sigma is not None:
+                sim.process.sigma = sigma
+            paths = sim.simulate_at_times(times, rng=np.random.default_rng(seed))
+            return discount * np.mean(payoff(paths))
+
+        h = spot_bump * self.S0
+        price = scenario_price(self.S0)
+        up, down = scenario_price(self.S0 + h), scenario_price(self.S0 - h)
+        delta = (up - down) / (2 * h)
+        gamma = (up - 2 * price + down) / h ** 2
+
+        # Vega needs a process with a volatility parameter (GBM and Merton, not Heston)
+        if hasattr(self.process, 'sigma'):
+            sigma = self.process.sigma
+            vega = (scenario_price(self.S0, sigma + vol_bump) - scenario_price(self.S0, sigma - vol_bump)) / (2 * vol_bump)
+        else:
+            vega = np.nan
+
+        return {'Price': price, 'Delta': delta, 'Gamma': gamma, 'Vega': vega}
+
     def calc_expected_final_price(self, paths):
         # Calculate the expected final price (mean of the paths)
         expected_price = np.mean(paths[-1, :])
@@ -0,0 +1,156 @@
+# Pipeline.py
+import os
+import pickle
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+"""
+STAGE GRAPH:
+    - A Stage is a function with declared input names and output names.
+    - The Pipeline orders stages by their data dependencies and runs every stage whose inputs are ready
+      concurrently on a thread pool.
+    - Each stage result is memoized under a key built from the stage name and the keys of its inputs,
+      so after a change only the stages downstream of the changed input are recomputed.
+    - Every value is keyed by a hash of its pickled content. Output hashes are computed once when a stage
+      runs and stored with its result, so a stage whose recomputed output is unchanged does not invalidate
+      the stages that read it.
+    - The in-memory cache keeps only the most recent results of each stage (max_cached_per_stage).
+"""
+
+class Stage:
+    def __init__(self, name, func, inputs, outputs):
+        self.name = name  # Unique stage name (part of the cache key)
+        self.func = func  # Called with the inputs as keyword arguments
+        self.inputs = list(inputs)  # Names of the values the stage reads
+        self.outputs = list(outputs)  # Names of the values the stage produces (a tuple is returned for several)
+
+def hash_value(value):
+    """ Hash any picklable value for use in a cache key. """
+    return hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+def file_version(path):
+    """ Modification time and size of a file, so cache keys change when the file is edited. """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+class Pipeline:
+    def __init__(self, stages, cache_dir=None, max_workers=None, max_cached_per_stage=1):
+        """
+        Parameters:
+            stages (list): Stage objects. Every output name must be produced by exactly one stage.
+            cache_dir (str or None): Directory for an on-disk pickle cache in addition to the in-memory one.
+            max_workers (int or None): Maximum number of stages run at the same time.
+            max_cached_per_stage (int): Results kept in memory for each stage, least recently used dropped first.
+        """
+        self.stages = list(stages)
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.max_cached_per_stage = max_cached_per_stage
+        self._cache = {stage.name: OrderedDict() for stage in self.stages}
+        self.last_run = {}  # Stage name -> 'computed' or 'cached' for the most recent run
+
+        producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in producers:
+                    raise ValueError(f"Output '{output}' is produced by both '{producers[output]}' and '{stage.name}'.")
+                producers[output] = stage.name
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _stage_key(self, stage, value_keys):
+        parts = [stage.name] + [f"{name}={value_keys[name]}" for name in stage.inputs]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _remember(self, stage, key, entry):
+        cache = self._cache[stage.name]
+        cache[key] = entry
+        cache.move_to_end(key)
+        while len(cache) > self.max_cached_per_stage:
+            cache.popitem(last=False)
+
+    def _load(self, stage, key):
+        """ Cached (result, output_keys) for a stage key, or None. """
+        if key in self._cache[stage.name]:
+            entry = self._cache[stage.name][key]
+            self._cache[stage.name].move_to_end(key)
+            return entry
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+                self._remember(stage, key, entry)
+                return entry
+        return None
+
+    def _store(self, stage, key, result):
+        output_keys = {name: hash_value(value) for name, value in self._unpack(stage, result).items()}
+        entry = (result, output_keys)
+        self._remember(stage, key, entry)
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.pkl")
+            with open(path + ".tmp", "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+        return entry
+
+    def _unpack(self, stage, result):
+        if len(stage.outputs) == 1:
+            return {stage.outputs[0]: result}
+        return dict(zip(stage.outputs, result))
+
+    def run(self, inputs):
+        """
+        Run the graph for the given raw inputs.
+
+        Parameters:
+            inputs (dict): Values for every name not produced by a stage.
+
+        Returns:
+            dict: The raw inputs plus every stage output.
+        """
+        values = dict(inputs)
+        value_keys = {name: hash_value(value) for name, value in inputs.items()}
+        pending = list(self.stages)
+        running = {}
+        self.last_run = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                # Start (or satisfy from the cache) every stage whose inputs are all available.
+                # A cache hit can unlock further stages, so repeat until nothing new is ready.
+                ready = [s for s in pending if all(name in values for name in s.inputs)]
+                while ready:
+                    for stage in ready:
+                        pending.remove(stage)
+                        key = self._stage_key(stage, value_keys)
+                        entry = self._load(stage, key)
+                        if entry is not None:
+                            self._finish(stage, entry, values, value_keys, "cached")
+                        else:
+                            kwargs = {name: values[name] for name in stage.inputs}
+                            running[executor.submit(stage.func, **kwargs)] = (stage, key)
+                    ready = [s for s in pending if all(name in values for name in s.inputs)]
+
+                if not running:
+                    if pending:
+                        missing = sorted({n for s in pending for n in s.inputs if n not in values})
+                        raise KeyError(f"Pipeline inputs missing or cyclic: {', '.join(missing)}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = running.pop(future)
+                    entry = self._store(stage, key, future.result())
+                    self._finish(stage, entry, values, value_keys, "computed")
+
+        return values
+
+    def _finish(self, stage, entry, values, value_keys, status):
+        result, output_keys = entry
+        values.update(self._unpack(stage, result))
+        value_keys.update(output_keys)
+        self.last_run[stage.name] = status
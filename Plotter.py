@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 from BlackScholes import black_scholes_call, black_scholes_put, black_scholes_call_div, black_scholes_put_div
+from FiniteDifference import crank_nicolson_price
 
 def plot_normalized_prices(stock_data, stock_name, save_path=None):
     """
@@ -124,7 +125,7 @@ def plot_histogram(final_prices, bin_size=0.25, bar_width=0.7, save_path=None):
 
 
 
-def plot_with_ITM_ATM_OTM(stock_name, stock_price, strike_price, time_to_maturity, risk_free_rate, volatility, dividend_yield=0, save_path=None):
+def plot_with_ITM_ATM_OTM(stock_name, stock_price, strike_price, time_to_maturity, risk_free_rate, volatility, dividend_yield=0, save_path=None, american=False):
     """
     Plots the Black-Scholes option prices with ITM, ATM, and OTM regions.
     Uses the dividend-adjusted formulas if a dividend yield is provided.
@@ -138,12 +139,19 @@ def plot_with_ITM_ATM_OTM(stock_name, stock_price, strike_price, time_to_maturit
         - volatility (float): Annualized stock price volatility (e.g., 0.2 for 20%).
         - dividend_yield (float): Continuous dividend yield (optional, default=0).
         - save_path (str): Path to save the plot (optional, default=None).
+        - american (bool): Price American options with the finite-difference solver (optional, default=False).
     """
     # Generate a range of stock prices for plotting
     stock_prices = np.linspace(stock_price * 0.5, stock_price * 1.5, 100)
 
     # Compute option prices using the appropriate formula
-    if dividend_yield > 0:
+    if american:
+        # One finite-difference solve per option type covers every stock price on the chart
+        call_prices = crank_nicolson_price(strike_price, time_to_maturity, risk_free_rate, volatility, dividend_yield,
+                                           option_type='call', american=True, stock_prices=stock_prices)['Option Prices']
+        put_prices = crank_nicolson_price(strike_price, time_to_maturity, risk_free_rate, volatility, dividend_yield,
+                                          option_type='put', american=True, stock_prices=stock_prices)['Option Prices']
+    elif dividend_yield > 0:
         call_prices = [black_scholes_call_div(s, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility) for s in stock_prices]
         put_prices = [black_scholes_put_div(s, strike_price, time_to_maturity, risk_free_rate, dividend_yield, volatility) for s in stock_prices]
     else:
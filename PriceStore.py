@@ -0,0 +1,177 @@
+# PriceStore.py
+import sqlite3
+import numpy as np
+from ExcelParse import parse_capm_sheet
+
+"""
+PRICE HISTORY STORE:
+    - SQLite file holding columnar chunks: every append stores one chunk per ticker with its dates and
+      prices as contiguous binary arrays (int32 days since 1970-01-01 and float64 prices).
+    - Chunks are indexed by (ticker, first day) and carry their last day, so a range query reads only the
+      chunks overlapping the range and decodes them with np.frombuffer (no per-row Python objects).
+    - The store is append-only: bars that already exist for a (ticker, day) are left untouched.
+    - compact() merges a ticker's chunks into one after many small daily appends.
+    - Dates come back as datetime64[D] arrays and prices as float64 arrays that feed straight into the Capm functions.
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    ticker TEXT NOT NULL,
+    first_day INTEGER NOT NULL,
+    last_day INTEGER NOT NULL,
+    days BLOB NOT NULL,
+    prices BLOB NOT NULL,
+    PRIMARY KEY (ticker, first_day)
+) WITHOUT ROWID
+"""
+
+DAY_DTYPE = np.dtype('<i4')
+PRICE_DTYPE = np.dtype('<f8')
+
+def to_days(dates):
+    """ Convert dates (strings, datetimes, pandas Series, datetime64) to integer days since the epoch. """
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+def _day_bound(date, default):
+    return default if date is None else int(to_days([date])[0])
+
+class PriceStore:
+    def __init__(self, path="PriceStore.db"):
+        """
+        Parameters:
+            path (str): SQLite database file (":memory:" for a temporary store).
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(SCHEMA)
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def _read_days(self, ticker, start_day, end_day):
+        """ Days and prices of every chunk overlapping [start_day, end_day], unfiltered and unsorted. """
+        cursor = self.connection.execute(
+            "SELECT days, prices FROM chunks WHERE ticker = ? AND first_day <= ? AND last_day >= ? ORDER BY first_day",
+            (ticker, end_day, start_day))
+        blobs = cursor.fetchall()
+        if not blobs:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        days = np.concatenate([np.frombuffer(d, dtype=DAY_DTYPE) for d, _ in blobs]).astype(np.int64)
+        prices = np.concatenate([np.frombuffer(p, dtype=PRICE_DTYPE) for _, p in blobs])
+        return days, prices
+
+    def append(self, ticker, dates, prices):
+        """
+        Append bars for one ticker as a new chunk. Existing (ticker, date) bars are kept as they are.
+
+        Returns:
+            int: Number of new bars stored.
+        """
+        days = to_days(dates)
+        prices = np.asarray(prices, dtype=float)
+        if len(days) != len(prices):
+            raise ValueError("Dates and prices must have the same length.")
+
+        # Drop missing prices and duplicate dates, then anything already stored
+        valid = ~np.isnan(prices)
+        days, first = np.unique(days[valid], return_index=True)
+        prices = prices[valid][first]
+        if len(days) == 0:
+            return 0
+        stored_days, _ = self._read_days(ticker, int(days[0]), int(days[-1]))
+        new = ~np.isin(days, stored_days)
+        days, prices = days[new], prices[new]
+        if len(days) == 0:
+            return 0
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO chunks (ticker, first_day, last_day, days, prices) VALUES (?, ?, ?, ?, ?)",
+                (ticker, int(days[0]), int(days[-1]), days.astype(DAY_DTYPE).tobytes(), prices.astype(PRICE_DTYPE).tobytes()))
+        return len(days)
+
+    def import_workbook(self, excel_file, capm_sheets, tickers=None):
+        """
+        Import sheets in the ExcelParse CAPM format (Date/Price columns).
+
+        Parameters:
+            excel_file (str): Path to the Excel file.
+            capm_sheets (list): Sheet names to import.
+            tickers (dict or None): Sheet name -> ticker (default: the sheet name).
+
+        Returns:
+            dict: Ticker -> number of new bars stored.
+        """
+        tickers = tickers or {}
+        imported = {}
+        for sheet, df in parse_capm_sheet(excel_file, capm_sheets).items():
+            ticker = tickers.get(sheet, sheet)
+            imported[ticker] = self.append(ticker, df['Date'].values, df['Price'].values)
+        return imported
+
+    def load(self, ticker, start=None, end=None):
+        """
+        Load one ticker's bars between start and end (inclusive).
+
+        Returns:
+            tuple: (dates as datetime64[D] array, prices as float64 array), in date order.
+        """
+        start_day, end_day = _day_bound(start, -2 ** 31), _day_bound(end, 2 ** 31)
+        days, prices = self._read_days(ticker, start_day, end_day)
+
+        # Chunks are disjoint in days but a back-filled chunk can interleave with later ones
+        if np.any(np.diff(days) < 0):
+            order = np.argsort(days, kind='stable')
+            days, prices = days[order], prices[order]
+
+        in_range = slice(np.searchsorted(days, start_day, 'left'), np.searchsorted(days, end_day, 'right'))
+        return days[in_range].astype('datetime64[D]'), prices[in_range]
+
+    def load_many(self, tickers, start=None, end=None):
+        """ Load several tickers. Returns a dict of ticker -> (dates, prices). """
+        return {ticker: self.load(ticker, start, end) for ticker in tickers}
+
+    def load_aligned(self, tickers, start=None, end=None):
+        """
+        Load several tickers on the dates they all share (e.g. a stock and its market index for CalcBeta).
+
+        Returns:
+            tuple: (dates, prices) where prices has one row per ticker and one column per common date.
+        """
+        series = self.load_many(tickers, start, end)
+        dates = series[tickers[0]][0]
+        for ticker in tickers[1:]:
+            dates = np.intersect1d(dates, series[ticker][0])
+        prices = np.vstack([series[ticker][1][np.isin(series[ticker][0], dates)] for ticker in tickers])
+        return dates, prices
+
+    def compact(self, ticker=None):
+        """ Merge each ticker's chunks into a single chunk (all tickers when ticker is None). """
+        for name in ([ticker] if ticker is not None else self.tickers()):
+            dates, prices = self.load(name)
+            if len(dates) == 0:
+                continue
+            days = to_days(dates)
+            with self.connection:
+                self.connection.execute("DELETE FROM chunks WHERE ticker = ?", (name,))
+                self.connection.execute(
+                    "INSERT INTO chunks (ticker, first_day, last_day, days, prices) VALUES (?, ?, ?, ?, ?)",
+                    (name, int(days[0]), int(days[-1]), days.astype(DAY_DTYPE).tobytes(), prices.astype(PRICE_DTYPE).tobytes()))
+
+    def tickers(self):
+        """ All tickers in the store. """
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT ticker FROM chunks ORDER BY ticker")]
+
+    def last_date(self, ticker):
+        """ Most recent stored date for a ticker (None if the ticker is unknown), for incremental appends. """
+        day = self.connection.execute("SELECT MAX(last_day) FROM chunks WHERE ticker = ?", (ticker,)).fetchone()[0]
+        return None if day is None else np.datetime64(day, 'D')
@@ -1,8 +1,21 @@
+import os
+import tempfile
 import unittest
 import numpy as np
-from BlackScholes import black_scholes_call, black_scholes_put, black_scholes_call_div, black_scholes_put_div
-from Capm import CalcExpectedReturn, CalcBeta
-from MonteCarloSim import MonteCarloSim
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from BlackScholes import black_scholes_call, black_scholes_put, black_scholes_call_div, black_scholes_put_div, black_scholes_chain
+from Capm import CalcExpectedReturn, CalcBeta, CalcReturns
+from Backtest import calc_crps, calc_window_beta, walk_forward_backtest, backtest_universe
+from Pipeline import Pipeline, Stage
+from FiniteDifference import crank_nicolson_price
+from ExcelExport import export_results, write_table
+from ExcelParse import parse_capm_sheet
+from PriceStore import PriceStore
+from LongstaffSchwartz import longstaff_schwartz
+from Volatility import (close_to_close_volatility, ewma_volatility, fit_garch, estimate_volatility,
+                        CloseToCloseVolatility, EWMAVolatility, GARCHVolatility)
+from MonteCarloSim import MonteCarloSim, GBMProcess, MertonJumpProcess, HestonProcess
 
 class TestBlackScholes(unittest.TestCase):
     def test_black_scholes_call(self):
@@ -60,3 +73,348 @@ class TestMonteCarloSim(unittest.TestCase):
         paths = mc_sim.simulate_paths()
         volatility = mc_sim.calc_volatility_from_paths(paths)
         self.assertTrue(volatility > 0)  # Volatility should be positive
+
+class TestProcessKernels(unittest.TestCase):
+    def test_gbm_terminal_single_step(self):
+        print("Running test_gbm_terminal_single_step")
+        # Exact GBM reaches maturity in one step with mean S0 * e^(mu*T)
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=200000, num_steps=252)
+        final_prices = mc_sim.simulate_terminal_prices(rng=np.random.default_rng(1))
+        self.assertAlmostEqual(np.mean(final_prices), 100 * np.exp(0.1), delta=0.3)
+
+    def test_merton_terminal_mean(self):
+        print("Running test_merton_terminal_mean")
+        # Jump compensation keeps the mean growth rate at mu
+        process = MertonJumpProcess(mu=0.1, sigma=0.2, jump_intensity=1.0, jump_mean=-0.1, jump_vol=0.15)
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=200000, num_steps=252, process=process)
+        final_prices = mc_sim.simulate_terminal_prices(rng=np.random.default_rng(2))
+        self.assertAlmostEqual(np.mean(final_prices), 100 * np.exp(0.1), delta=0.5)
+
+    def test_heston_terminal_mean(self):
+        print("Running test_heston_terminal_mean")
+        # QE scheme steps through the grid since Heston is not sampled exactly
+        process = HestonProcess(mu=0.05, v0=0.04, kappa=1.5, theta=0.04, xi=0.5, rho=-0.7)
+        mc_sim = MonteCarloSim(S0=100, mu=0.05, sigma=0.2, T=1, num_simulations=100000, num_steps=50, process=process)
+        final_prices = mc_sim.simulate_terminal_prices(rng=np.random.default_rng(3))
+        self.assertFalse(process.exact)
+        self.assertAlmostEqual(np.mean(final_prices), 100 * np.exp(0.05), delta=0.5)
+
+class TestObservationDates(unittest.TestCase):
+    def test_simulate_at_times_shape(self):
+        print("Running test_simulate_at_times_shape")
+        # One row per requested observation date
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=500, num_steps=252)
+        paths = mc_sim.simulate_at_times([0.25, 0.5, 1.0], rng=np.random.default_rng(4))
+        self.assertEqual(paths.shape, (3, 500))
+
+    def test_refine_paths_marginal(self):
+        print("Running test_refine_paths_marginal")
+        # Bridged points keep the GBM marginal distribution of log prices
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=100000, num_steps=252)
+        rng = np.random.default_rng(5)
+        paths = mc_sim.simulate_at_times([1.0], rng=rng)
+        grid, refined = mc_sim.refine_paths([1.0], paths, [0.3], rng=rng)
+        self.assertEqual(list(grid), [0.0, 0.3, 1.0])
+        log_mid = np.log(refined[1])
+        self.assertAlmostEqual(np.mean(log_mid), np.log(100) + (0.1 - 0.02) * 0.3, delta=0.005)
+        self.assertAlmostEqual(np.std(log_mid), 0.2 * np.sqrt(0.3), delta=0.005)
+
+    def test_refine_paths_requires_bridge(self):
+        print("Running test_refine_paths_requires_bridge")
+        # Heston has no Brownian bridge, so refinement is rejected
+        process = HestonProcess(mu=0.05, v0=0.04, kappa=1.5, theta=0.04, xi=0.5, rho=-0.7)
+        mc_sim = MonteCarloSim(S0=100, mu=0.05, sigma=0.2, T=1, num_simulations=100, num_steps=10, process=process)
+        paths = mc_sim.simulate_at_times([1.0], rng=np.random.default_rng(15))
+        with self.assertRaises(TypeError):
+            mc_sim.refine_paths([1.0], paths, [0.5])
+
+class TestBacktest(unittest.TestCase):
+    def test_calc_crps_point_forecast(self):
+        print("Running test_calc_crps_point_forecast")
+        # A single-sample ensemble reduces CRPS to the absolute error
+        crps = calc_crps(np.array([[3.0], [5.0]]), np.array([1.0, 6.0]))
+        np.testing.assert_allclose(crps, [2.0, 1.0])
+
+    def test_calc_window_beta_matches_capm(self):
+        print("Running test_calc_window_beta_matches_capm")
+        rng = np.random.default_rng(6)
+        stock_returns = rng.normal(0.01, 0.05, (3, 24))
+        market_returns = rng.normal(0.01, 0.04, (3, 24))
+        betas = calc_window_beta(stock_returns, market_returns)
+        for i in range(3):
+            self.assertAlmostEqual(betas[i], CalcBeta(stock_returns[i], market_returns[i]))
+
+    def test_walk_forward_coverage(self):
+        print("Running test_walk_forward_coverage")
+        # On GBM data the 90% interval should cover roughly 90% of realised prices
+        rng = np.random.default_rng(7)
+        prices = 100 * np.exp(np.cumsum(rng.normal(0.005, 0.05, 600)))
+        result = walk_forward_backtest(prices, window=60, horizon=1, num_simulations=2000, rng=rng)
+        self.assertEqual(len(result['Origins']), 600 - 60 - 1)
+        self.assertAlmostEqual(result['Metrics']['Coverage'], 0.9, delta=0.05)
+
+    def test_backtest_universe(self):
+        print("Running test_backtest_universe")
+        rng = np.random.default_rng(8)
+        price_data = {f"T{i}": 100 * np.exp(np.cumsum(rng.normal(0, 0.05, 120))) for i in range(3)}
+        results = backtest_universe(price_data, max_workers=2, seed=1, window=24, num_simulations=200)
+        self.assertEqual(sorted(results), ["T0", "T1", "T2"])
+        self.assertTrue(all(r['Metrics']['RMSE'] > 0 for r in results.values()))
+
+class TestPipeline(unittest.TestCase):
+    def test_recomputes_only_affected_stages(self):
+        print("Running test_recomputes_only_affected_stages")
+        calls = []
+        def double(a):
+            calls.append("double")
+            return 2 * a
+        def add(b, doubled):
+            calls.append("add")
+            return b + doubled
+        pipeline = Pipeline([Stage("add", add, ["b", "doubled"], ["total"]),
+                             Stage("double", double, ["a"], ["doubled"])])
+        self.assertEqual(pipeline.run({"a": 1, "b": 10})["total"], 12)
+        # Changing b leaves the double stage cached
+        self.assertEqual(pipeline.run({"a": 1, "b": 20})["total"], 22)
+        self.assertEqual(calls, ["double", "add", "add"])
+        self.assertEqual(pipeline.last_run, {"double": "cached", "add": "computed"})
+
+    def test_unchanged_output_keeps_downstream_cached(self):
+        print("Running test_unchanged_output_keeps_downstream_cached")
+        pipeline = Pipeline([Stage("rate", lambda params: params["rate"], ["params"], ["rate"]),
+                             Stage("grow", lambda rate: 100 * (1 + rate), ["rate"], ["value"])])
+        pipeline.run({"params": {"rate": 0.05, "strike": 100}})
+        # Only the strike changed, so the recomputed rate is identical and grow stays cached
+        pipeline.run({"params": {"rate": 0.05, "strike": 120}})
+        self.assertEqual(pipeline.last_run, {"rate": "computed", "grow": "cached"})
+
+    def test_cache_keeps_latest_result_per_stage(self):
+        print("Running test_cache_keeps_latest_result_per_stage")
+        pipeline = Pipeline([Stage("square", lambda x: x * x, ["x"], ["y"])])
+        for x in range(5):
+            pipeline.run({"x": x})
+        self.assertEqual(len(pipeline._cache["square"]), 1)
+
+    def test_missing_input(self):
+        print("Running test_missing_input")
+        pipeline = Pipeline([Stage("square", lambda x: x * x, ["x"], ["y"])])
+        with self.assertRaises(KeyError):
+            pipeline.run({})
+
+class TestFiniteDifference(unittest.TestCase):
+    def test_european_matches_black_scholes(self):
+        print("Running test_european_matches_black_scholes")
+        stock_prices = [80, 100, 120]
+        result = crank_nicolson_price(95, 1, 0.05, 0.2, 0.02, option_type='call', stock_prices=stock_prices)
+        for s, price in zip(stock_prices, result['Option Prices']):
+            self.assertAlmostEqual(price, black_scholes_call_div(s, 95, 1, 0.05, 0.02, 0.2), delta=0.01)
+
+    def test_american_put(self):
+        print("Running test_american_put")
+        # Reference value for S = K = 100, T = 1, r = 5%, sigma = 20% is about 6.090
+        result = crank_nicolson_price(100, 1, 0.05, 0.2, option_type='put', american=True, stock_prices=[80, 100])
+        self.assertAlmostEqual(result['Option Prices'][1], 6.090, delta=0.01)
+        self.assertAlmostEqual(result['Option Prices'][0], 20.0, delta=1e-6)  # Deep ITM is exercised
+        self.assertGreater(result['Option Prices'][1], black_scholes_put(100, 100, 1, 0.05, 0.2))
+        self.assertGreater(result['Gamma'][1], 0)
+
+class TestMonteCarloGreeks(unittest.TestCase):
+    # Black-Scholes call Greeks for S = 100, K = 95, T = 1, r = 5%, sigma = 20%
+    BS_DELTA, BS_GAMMA, BS_VEGA = 0.7279, 0.01660, 33.19
+
+    def check_greeks(self, greeks, gamma_delta, vega_delta=0.8):
+        self.assertAlmostEqual(greeks['Price'], black_scholes_call(100, 95, 1, 0.05, 0.2), delta=0.15)
+        self.assertAlmostEqual(greeks['Delta'], self.BS_DELTA, delta=0.01)
+        self.assertAlmostEqual(greeks['Gamma'], self.BS_GAMMA, delta=gamma_delta)
+        self.assertAlmostEqual(greeks['Vega'], self.BS_VEGA, delta=vega_delta)
+
+    def test_pathwise_greeks(self):
+        print("Running test_pathwise_greeks")
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=200000, num_steps=252)
+        self.check_greeks(mc_sim.calc_greeks(95, 0.05, rng=np.random.default_rng(9)), 0.0005)
+
+    def test_likelihood_ratio_greeks(self):
+        print("Running test_likelihood_ratio_greeks")
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=200000, num_steps=252)
+        self.check_greeks(mc_sim.calc_greeks(95, 0.05, method='likelihood_ratio', rng=np.random.default_rng(10)), 0.001, 1.5)
+
+    def test_finite_difference_common_random_numbers(self):
+        print("Running test_finite_difference_common_random_numbers")
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=200000, num_steps=252)
+        self.check_greeks(mc_sim.calc_greeks(95, 0.05, method='finite_difference', seed=11), 0.001)
+
+    def test_terminal_methods_use_process(self):
+        print("Running test_terminal_methods_use_process")
+        # The process sigma is used even when it differs from the simulator's sigma attribute
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.5, T=1, num_simulations=200000, num_steps=252,
+                               process=GBMProcess(mu=0.1, sigma=0.2))
+        self.check_greeks(mc_sim.calc_greeks(95, 0.05, rng=np.random.default_rng(9)), 0.0005)
+
+        heston = HestonProcess(mu=0.05, v0=0.04, kappa=1.5, theta=0.04, xi=0.5, rho=-0.7)
+        mc_sim = MonteCarloSim(S0=100, mu=0.05, sigma=0.2, T=1, num_simulations=1000, num_steps=12, process=heston)
+        for method in ('pathwise', 'likelihood_ratio'):
+            with self.assertRaises(ValueError):
+                mc_sim.calc_greeks(95, 0.05, method=method)
+
+    def test_pathwise_rejects_custom_payoff(self):
+        print("Running test_pathwise_rejects_custom_payoff")
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=1000, num_steps=12)
+        digital = lambda prices: (prices[-1] > 95).astype(float)
+        with self.assertRaises(ValueError):
+            mc_sim.calc_greeks(95, 0.05, payoff=digital)
+        self.assertIn('Delta', mc_sim.calc_greeks(95, 0.05, method='likelihood_ratio', payoff=digital))
+
+class TestExcelExport(unittest.TestCase):
+    def test_black_scholes_chain(self):
+        print("Running test_black_scholes_chain")
+        chain = black_scholes_chain(100, [90, 95], 1, 0.05, 0.2, 0.02)
+        self.assertAlmostEqual(chain['Call Price'][1], black_scholes_call_div(100, 95, 1, 0.05, 0.02, 0.2))
+        self.assertAlmostEqual(chain['Put Price'][0], black_scholes_put_div(100, 90, 1, 0.05, 0.02, 0.2))
+
+    def test_export_keeps_input_sheets(self):
+        print("Running test_export_keeps_input_sheets")
+        with tempfile.TemporaryDirectory() as tmp:
+            excel_file = os.path.join(tmp, "Database.xlsx")
+            prices = pd.DataFrame({"Date": pd.date_range("2020-01-31", periods=12, freq="ME"), "Price": np.arange(100.0, 112.0)})
+            prices.to_excel(excel_file, sheet_name="CAPM Sheet", startrow=1, index=False)
+
+            paths = np.full((5, 20), 100.0)
+            written = export_results(excel_file, {"CAPM": {"Beta": 1.1}}, final_prices=np.arange(1000.0), paths=paths, max_path_samples=3)
+            self.assertEqual(written["Results MC Paths"], 15)
+
+            # The input workbook is untouched unless overwriting is asked for
+            output_file = os.path.join(tmp, "Database Results.xlsx")
+            self.assertEqual(len(parse_capm_sheet(output_file, ["CAPM Sheet"])["CAPM Sheet"]), 12)
+            workbook = load_workbook(excel_file, read_only=True)
+            self.assertEqual(workbook.sheetnames, ["CAPM Sheet"])
+            workbook.close()
+            with self.assertRaises(ValueError):
+                export_results(excel_file, {"CAPM": {"Beta": 1.2}}, output_file=excel_file)
+
+            # Exporting twice in place replaces the result sheets instead of duplicating them
+            export_results(excel_file, {"CAPM": {"Beta": 1.1}}, output_file=excel_file, overwrite=True)
+            export_results(excel_file, {"CAPM": {"Beta": 1.2}}, output_file=excel_file, overwrite=True)
+            workbook = load_workbook(excel_file, read_only=True)
+            self.assertEqual(workbook.sheetnames, ["CAPM Sheet", "Results Summary"])
+            workbook.close()
+            self.assertEqual(len(parse_capm_sheet(excel_file, ["CAPM Sheet"])["CAPM Sheet"]), 12)
+
+    def test_write_table_continuation_sheets(self):
+        print("Running test_write_table_continuation_sheets")
+        workbook = Workbook(write_only=True)
+        written = write_table(workbook, "Results Big", ["Value"], ((i,) for i in range(10)), max_rows=4)
+        self.assertEqual(written, 10)
+        self.assertEqual(workbook.sheetnames, ["Results Big", "Results Big (2)", "Results Big (3)", "Results Big (4)"])
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook.save(os.path.join(tmp, "Big.xlsx"))  # Write-only sheets are flushed on save
+
+class TestPriceStore(unittest.TestCase):
+    def test_append_only_and_range_query(self):
+        print("Running test_append_only_and_range_query")
+        with PriceStore(":memory:") as store:
+            dates = np.arange(np.datetime64("2024-01-01"), np.datetime64("2024-01-11"))
+            self.assertEqual(store.append("AAPL", dates, np.arange(10.0)), 10)
+            # Existing bars are kept, only the new day is stored
+            self.assertEqual(store.append("AAPL", ["2024-01-10", "2024-01-11"], [99.0, 11.0]), 1)
+            loaded_dates, prices = store.load("AAPL", "2024-01-09", "2024-01-11")
+            self.assertEqual(list(loaded_dates.astype(str)), ["2024-01-09", "2024-01-10", "2024-01-11"])
+            np.testing.assert_allclose(prices, [8.0, 9.0, 11.0])
+            self.assertEqual(store.last_date("AAPL"), np.datetime64("2024-01-11"))
+
+    def test_backfill_and_compact(self):
+        print("Running test_backfill_and_compact")
+        with PriceStore(":memory:") as store:
+            store.append("SPX", ["2024-01-02", "2024-01-04"], [2.0, 4.0])
+            store.append("SPX", ["2024-01-03", "2024-01-01"], [3.0, 1.0])
+            store.compact()
+            dates, prices = store.load("SPX")
+            self.assertEqual(len(dates), 4)
+            np.testing.assert_allclose(prices, [1.0, 2.0, 3.0, 4.0])
+
+    def test_import_workbook_feeds_capm(self):
+        print("Running test_import_workbook_feeds_capm")
+        with tempfile.TemporaryDirectory() as tmp, PriceStore(os.path.join(tmp, "Prices.db")) as store:
+            excel_file = os.path.join(tmp, "Database.xlsx")
+            sheet = pd.DataFrame({"Date": pd.date_range("2020-01-31", periods=12, freq="ME"), "Price": np.arange(100.0, 112.0)})
+            sheet.to_excel(excel_file, sheet_name="CAPM Sheet", startrow=1, index=False)
+            self.assertEqual(store.import_workbook(excel_file, ["CAPM Sheet"], {"CAPM Sheet": "AAPL"}), {"AAPL": 12})
+            dates, prices = store.load_aligned(["AAPL", "AAPL"])
+            self.assertEqual(prices.shape, (2, 12))
+            self.assertAlmostEqual(CalcBeta(CalcReturns(prices[0]), CalcReturns(prices[1])), 11 / 10)  # CalcBeta scales by n / (n - 1)
+
+class TestVolatility(unittest.TestCase):
+    def setUp(self):
+        # Two tickers simulated from GARCH(1,1) with omega = 2e-6, alpha = 0.08, beta = 0.9
+        rng = np.random.default_rng(12)
+        returns = np.zeros((2, 3000))
+        variance = np.full(2, 1e-4)
+        for t in range(3000):
+            returns[:, t] = np.sqrt(variance) * rng.standard_normal(2)
+            variance = 2e-6 + 0.08 * returns[:, t] ** 2 + 0.9 * variance
+        self.prices = 100 * np.exp(np.hstack((np.zeros((2, 1)), np.cumsum(returns, axis=1))))
+
+    def test_incremental_matches_batch(self):
+        print("Running test_incremental_matches_batch")
+        close_to_close, ewma = CloseToCloseVolatility(), EWMAVolatility(lam=0.94)
+        for price in self.prices[0]:
+            close_to_close.update(price)
+            ewma.update(price)
+        self.assertAlmostEqual(close_to_close.volatility, close_to_close_volatility(self.prices)[0])
+        self.assertAlmostEqual(ewma.volatility, ewma_volatility(self.prices, lam=0.94)[0, -1])
+
+    def test_fit_garch(self):
+        print("Running test_fit_garch")
+        fit = fit_garch(self.prices)
+        np.testing.assert_allclose(fit['alpha'], 0.08, atol=0.03)
+        np.testing.assert_allclose(fit['beta'], 0.9, atol=0.04)
+        # Running the fitted filter over the same prices reproduces the batch forecast
+        garch = GARCHVolatility(fit['omega'][0], fit['alpha'][0], fit['beta'][0])
+        for price in self.prices[0]:
+            garch.update(price)
+        self.assertAlmostEqual(garch.volatility, fit['volatility'][0], delta=0.02)
+
+    def test_estimate_volatility_feeds_monte_carlo(self):
+        print("Running test_estimate_volatility_feeds_monte_carlo")
+        sigma = estimate_volatility(self.prices[0], method='ewma')
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=sigma, T=1, num_simulations=100, num_steps=10)
+        self.assertIsInstance(sigma, float)
+        self.assertEqual(mc_sim.process.sigma, sigma)
+
+class TestLongstaffSchwartz(unittest.TestCase):
+    def test_american_put_reference(self):
+        print("Running test_american_put_reference")
+        # Longstaff and Schwartz (2001), table 1: S0 = 36, K = 40, r = 6%, sigma = 20%, T = 1, 50 dates -> 4.478
+        mc_sim = MonteCarloSim(S0=36, mu=0.1, sigma=0.2, T=1, num_simulations=100000, num_steps=50)
+        result = longstaff_schwartz(mc_sim, 40, 0.06, rng=np.random.default_rng(13))
+        self.assertAlmostEqual(result['Price'], 4.478, delta=0.04)
+        self.assertAlmostEqual(result['European Price'], black_scholes_put(36, 40, 1, 0.06, 0.2))
+        self.assertGreater(result['Early Exercise Premium'], 0)
+        low, high = result['Confidence Interval']
+        self.assertLess(low, result['Price'])
+        self.assertGreater(high, result['Price'])
+
+    def test_call_without_dividends_is_european(self):
+        print("Running test_call_without_dividends_is_european")
+        # Early exercise of a call on a non-dividend stock is never optimal
+        mc_sim = MonteCarloSim(S0=100, mu=0.1, sigma=0.2, T=1, num_simulations=100000, num_steps=50)
+        result = longstaff_schwartz(mc_sim, 95, 0.05, option_type='call', num_exercise_dates=10, rng=np.random.default_rng(14))
+        self.assertAlmostEqual(result['Price'], result['European Price'], delta=3 * result['Std Error'] + 0.02)
+
+    def test_immediate_exercise_floor_inside_interval(self):
+        print("Running test_immediate_exercise_floor_inside_interval")
+        # Deep in the money with only a late exercise date, so exercising today beats holding
+        mc_sim = MonteCarloSim(S0=10, mu=0.1, sigma=0.2, T=1, num_simulations=10000, num_steps=10)
+        result = longstaff_schwartz(mc_sim, 40, 0.06, exercise_times=[1.0], rng=np.random.default_rng(15))
+        self.assertAlmostEqual(result['Price'], 30)
+        low, high = result['Confidence Interval']
+        self.assertLessEqual(low, result['Price'])
+        self.assertGreaterEqual(high, result['Price'])
+
+    def test_european_price_follows_process(self):
+        print("Running test_european_price_follows_process")
+        heston = HestonProcess(mu=0.05, v0=0.04, kappa=1.5, theta=0.04, xi=0.5, rho=-0.7)
+        mc_sim = MonteCarloSim(S0=36, mu=0.05, sigma=0.9, T=1, num_simulations=50000, num_steps=50, process=heston)
+        result = longstaff_schwartz(mc_sim, 40, 0.06, num_exercise_dates=25, rng=np.random.default_rng(16))
+        # Not the Black-Scholes value at the unrelated sigma attribute
+        self.assertLess(result['European Price'], black_scholes_put(36, 40, 1, 0.06, 0.9) - 1)
+        self.assertGreater(result['Early Exercise Premium'], 0)
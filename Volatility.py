@@ -0,0 +1,227 @@
+# Volatility.py
+import numpy as np
+from scipy.signal import lfilter
+from scipy.optimize import minimize
+
+"""
+VARIABLES:
+    - r_t: Log return from price t-1 to price t.
+    - sigma^2_t: Conditional variance of r_t.
+    - periods_per_year: Observations per year (12 for the monthly CAPM sheet, 252 for daily prices).
+
+ESTIMATORS:
+    - Close-to-close: sample standard deviation of log returns.
+    - EWMA: sigma^2_t = lam * sigma^2_(t-1) + (1 - lam) * r^2_t
+    - GARCH(1,1): sigma^2_t = omega + alpha * r^2_(t-1) + beta * sigma^2_(t-1)
+
+Both recursions are first-order linear filters in r^2, so whole (tickers x time) arrays are run through
+scipy.signal.lfilter at once. The *Volatility classes apply the same recursions one observation at a time.
+All results are annualized volatilities.
+"""
+
+def log_returns(prices):
+    """ Log returns along the last axis of a price array (one row per ticker). """
+    return np.diff(np.log(np.asarray(prices, dtype=float)), axis=-1)
+
+def close_to_close_volatility(prices, periods_per_year=252):
+    """
+    Annualized close-to-close volatility.
+
+    Parameters:
+        prices (array-like): Prices (time,) or (tickers x time).
+
+    Returns:
+        float or ndarray: Volatility per ticker.
+    """
+    return np.std(log_returns(prices), axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+def ewma_volatility(prices, lam=0.94, periods_per_year=252):
+    """
+    EWMA (RiskMetrics) volatility after every observation, seeded with the first squared return.
+
+    Returns:
+        ndarray: Annualized volatility series, same shape as the returns. The last column is the current estimate.
+    """
+    r2 = log_returns(prices) ** 2
+    initial = lam * r2[..., :1]
+    variance, _ = lfilter([1 - lam], [1, -lam], r2, axis=-1, zi=initial)
+    return np.sqrt(variance * periods_per_year)
+
+def garch_variance(returns, omega, alpha, beta, initial_variance):
+    """
+    GARCH(1,1) conditional variances sigma^2_1..sigma^2_n for returns r_1..r_n (tickers x time).
+    omega, alpha and initial_variance may be scalars or one value per ticker; sigma^2_1 is initial_variance.
+    """
+    returns = np.atleast_2d(returns)
+    num_tickers = returns.shape[0]
+    omega, alpha, initial_variance = (np.broadcast_to(np.reshape(p, (-1, 1)), (num_tickers, 1))
+                                      for p in (omega, alpha, initial_variance))
+
+    # x_t = omega + alpha * r^2_(t-1) for t >= 2, then sigma^2_t = x_t + beta * sigma^2_(t-1)
+    x = omega + alpha * returns[:, :-1] ** 2
+    variance = np.empty(returns.shape)
+    variance[:, :1] = initial_variance
+    if np.ndim(beta) == 0:
+        # A shared beta means one filter call covers every ticker
+        variance[:, 1:], _ = lfilter([1], [1, -beta], x, axis=1, zi=beta * initial_variance)
+    else:
+        beta = np.broadcast_to(np.reshape(beta, (-1, 1)), (num_tickers, 1))
+        for i in range(num_tickers):
+            variance[i, 1:], _ = lfilter([1], [1, -beta[i, 0]], x[i], zi=beta[i] * initial_variance[i])
+    return variance
+
+def garch_neg_log_likelihood(returns, omega, alpha, beta):
+    """ Gaussian negative log-likelihood (up to a constant) of each row of returns. """
+    returns = np.atleast_2d(returns)
+    initial_variance = np.var(returns, axis=1)
+    variance = garch_variance(returns, omega, alpha, beta, initial_variance)
+    return 0.5 * np.sum(np.log(variance) + returns ** 2 / variance, axis=1)
+
+def fit_garch(prices, periods_per_year=252, grid_size=12):
+    """
+    Fit GARCH(1,1) to each ticker by maximum likelihood with variance targeting
+    (omega = sample variance * (1 - alpha - beta)).
+
+    A coarse (alpha, beta) grid is scored for all tickers at once, then each ticker is refined with SLSQP
+    starting from its best grid point.
+
+    Parameters:
+        prices (array-like): Prices (time,) or (tickers x time).
+        periods_per_year (int): Observations per year used to annualize the forecast.
+        grid_size (int): Number of grid values for alpha and for beta.
+
+    Returns:
+        dict: 'omega', 'alpha', 'beta', 'variance' (last conditional variance), 'next_variance'
+              (one-step forecast) and 'volatility' (annualized one-step forecast), one entry per ticker.
+    """
+    returns = np.atleast_2d(log_returns(prices))
+    returns = returns - returns.mean(axis=1, keepdims=True)
+    sample_variance = np.var(returns, axis=1)
+    num_tickers = returns.shape[0]
+
+    # Coarse grid over the stationary region, evaluated for every ticker together
+    best_nll = np.full(num_tickers, np.inf)
+    best = np.zeros((num_tickers, 2))
+    for a in np.linspace(0.02, 0.3, grid_size):
+        for b in np.linspace(0.5, 0.97, grid_size):
+            if a + b >= 0.999:
+                continue
+            nll = garch_neg_log_likelihood(returns, sample_variance * (1 - a - b), a, b)
+            better = nll < best_nll
+            best_nll[better] = nll[better]
+            best[better] = (a, b)
+
+    # Per-ticker refinement
+    alpha, beta = best[:, 0].copy(), best[:, 1].copy()
+    constraint = {'type': 'ineq', 'fun': lambda p: 0.999 - p[0] - p[1]}
+    for i in range(num_tickers):
+        row, var_i = returns[i:i + 1], sample_variance[i]
+        objective = lambda p: garch_neg_log_likelihood(row, var_i * (1 - p[0] - p[1]), p[0], p[1])[0]
+        result = minimize(objective, best[i], method='SLSQP', bounds=[(1e-6, 0.999), (0.0, 0.999)],
+                          constraints=[constraint])
+        if result.success and result.fun <= best_nll[i]:
+            alpha[i], beta[i] = result.x
+
+    omega = sample_variance * (1 - alpha - beta)
+    variance = garch_variance(returns, omega, alpha, beta, sample_variance)[:, -1]
+    next_variance = omega + alpha * returns[:, -1] ** 2 + beta * variance
+
+    return {
+        'omega': omega,
+        'alpha': alpha,
+        'beta': beta,
+        'variance': variance,
+        'next_variance': next_variance,
+        'volatility': np.sqrt(next_variance * periods_per_year)
+    }
+
+def estimate_volatility(prices, method='close_to_close', periods_per_year=252, lam=0.94):
+    """
+    Current annualized volatility of each ticker, ready to use as MonteCarloSim sigma or Black-Scholes volatility.
+
+    Parameters:
+        prices (array-like): Prices (time,) or (tickers x time).
+        method (str): 'close_to_close', 'ewma' or 'garch'.
+
+    Returns:
+        float or ndarray: Volatility (a float for a single price series).
+    """
+    single = np.ndim(prices) == 1
+    if method == 'close_to_close':
+        volatility = close_to_close_volatility(prices, periods_per_year)
+    elif method == 'ewma':
+        volatility = ewma_volatility(prices, lam, periods_per_year)[..., -1]
+    elif method == 'garch':
+        volatility = fit_garch(prices, periods_per_year)['volatility']
+    else:
+        raise ValueError(f"Unknown volatility method '{method}', expected 'close_to_close', 'ewma' or 'garch'.")
+    return float(np.ravel(volatility)[0]) if single else volatility
+
+class CloseToCloseVolatility:
+    """ Running close-to-close volatility (Welford's update of the mean and variance of log returns). """
+    def __init__(self, periods_per_year=252):
+        self.periods_per_year = periods_per_year
+        self.last_price = None
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, price):
+        if self.last_price is not None:
+            r = np.log(price / self.last_price)
+            self.count += 1
+            delta = r - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (r - self.mean)
+        self.last_price = price
+        return self.volatility
+
+    @property
+    def volatility(self):
+        if self.count < 2:
+            return np.nan
+        return np.sqrt(self.m2 / (self.count - 1) * self.periods_per_year)
+
+class EWMAVolatility:
+    """ EWMA volatility updated one price at a time (seeded with the first squared return, like ewma_volatility). """
+    def __init__(self, lam=0.94, periods_per_year=252, variance=None):
+        self.lam = lam
+        self.periods_per_year = periods_per_year
+        self.variance = variance
+        self.last_price = None
+
+    def update(self, price):
+        if self.last_price is not None:
+            r2 = np.log(price / self.last_price) ** 2
+            self.variance = r2 if self.variance is None else self.lam * self.variance + (1 - self.lam) * r2
+        self.last_price = price
+        return self.volatility
+
+    @property
+    def volatility(self):
+        return np.nan if self.variance is None else np.sqrt(self.variance * self.periods_per_year)
+
+class GARCHVolatility:
+    """
+    GARCH(1,1) filter with fixed parameters (e.g. from fit_garch), updated one price at a time.
+    `variance` is the forecast for the next return; `volatility` annualizes it.
+    """
+    def __init__(self, omega, alpha, beta, variance=None, periods_per_year=252):
+        self.omega = omega
+        self.alpha = alpha
+        self.beta = beta
+        self.periods_per_year = periods_per_year
+        # Start from the long-run variance unless a current forecast is given
+        self.variance = omega / (1 - alpha - beta) if variance is None else variance
+        self.last_price = None
+
+    def update(self, price):
+        if self.last_price is not None:
+            r = np.log(price / self.last_price)
+            self.variance = self.omega + self.alpha * r ** 2 + self.beta * self.variance
+        self.last_price = price
+        return self.volatility
+
+    @property
+    def volatility(self):
+        return np.sqrt(self.variance * self.periods_per_year)